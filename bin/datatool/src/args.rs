@@ -185,6 +185,12 @@ pub(crate) struct SubcParams {
         description = "permit blank proofs after timeout in millis (default strict)"
     )]
     pub(crate) proof_timeout: Option<u32>,
+
+    #[argh(
+        option,
+        description = "depth at which L1 blocks are considered safe from reorgs (default 4)"
+    )]
+    pub(crate) reorg_safe_depth: Option<u32>,
 }
 
 pub(crate) struct CmdContext {
@@ -266,6 +266,7 @@ fn exec_genparams(cmd: SubcParams, ctx: &mut CmdContext) -> anyhow::Result<()> {
         // TODO make a const
         deposit_sats,
         proof_timeout: cmd.proof_timeout,
+        reorg_safe_depth: cmd.reorg_safe_depth.unwrap_or(4),
     };
 
     let params = construct_params(config);
@@ -415,6 +416,8 @@ pub struct ParamsConfig {
     deposit_sats: u64,
     /// Timeout for proofs.
     proof_timeout: Option<u32>,
+    /// Depth at which L1 blocks are considered safe from reorgs.
+    reorg_safe_depth: u32,
 }
 
 /// Constructs the parameters for a Strata network.
@@ -457,8 +460,7 @@ fn construct_params(config: ParamsConfig) -> RollupParams {
             "0x351714af72d74259f45cd7eab0b04527cd40e74836a45abcae50f92d919d988f"
                 .parse()
                 .unwrap(),
-        // TODO make configurable
-        l1_reorg_safe_depth: 4,
+        l1_reorg_safe_depth: config.reorg_safe_depth,
         target_l2_batch_size: config.epoch_slots as u64,
         address_length: 20,
         deposit_amount: config.deposit_sats,
@@ -16,6 +16,9 @@ pub(crate) const BRIDGE_IN_AMOUNT: Amount = Amount::from_sat(1_001_000_000);
 #[allow(dead_code)] // TODO: Remove this when bridge out is implemented
 pub(crate) const BRIDGE_OUT_AMOUNT: Amount = Amount::from_int_btc(10);
 
+/// Length of a single Schnorr precompile input: `public_key || message_hash || signature`.
+pub(crate) const SCHNORR_PRECOMPILE_INPUT_LEN: usize = 32 + 32 + 64;
+
 /// An xpriv that is good enough for testing purposes.
 ///
 /// # Warning
@@ -17,7 +17,10 @@ use crate::{
     constants::{BRIDGE_IN_AMOUNT, MAGIC_BYTES, NETWORK, RECOVER_DELAY, XPRIV},
     error::Error,
     parse::{parse_address, parse_el_address, parse_xonly_pk},
-    taproot::{bridge_wallet, new_bitcoind_client, sync_wallet, taproot_wallet, ExtractP2trPubkey},
+    taproot::{
+        bridge_wallet, build_with_pending_spends, new_bitcoind_client, sync_wallet, taproot_wallet,
+        ExtractP2trPubkey,
+    },
 };
 
 /// Generates a deposit request transaction (DRT).
@@ -35,19 +38,23 @@ use crate::{
 /// A signed (with the `private_key`) and serialized transaction.
 #[pyfunction]
 pub(crate) fn deposit_request_transaction(
+    py: Python<'_>,
     el_address: String,
     musig_bridge_pk: String,
     bitcoind_url: String,
     bitcoind_user: String,
     bitcoind_password: String,
 ) -> PyResult<Vec<u8>> {
-    let signed_tx = deposit_request_transaction_inner(
-        el_address.as_str(),
-        musig_bridge_pk.as_str(),
-        bitcoind_url.as_str(),
-        bitcoind_user.as_str(),
-        bitcoind_password.as_str(),
-    )?;
+    // Release the GIL while talking to bitcoind, so other Python threads can run.
+    let signed_tx = py.allow_threads(|| {
+        deposit_request_transaction_inner(
+            el_address.as_str(),
+            musig_bridge_pk.as_str(),
+            bitcoind_url.as_str(),
+            bitcoind_user.as_str(),
+            bitcoind_password.as_str(),
+        )
+    })?;
     let signed_tx = serialize(&signed_tx);
     Ok(signed_tx)
 }
@@ -110,19 +117,25 @@ fn deposit_request_transaction_inner(
     // Before signing the transaction, we need to sync the wallet with bitcoind
     sync_wallet(&mut wallet, &client)?;
 
-    let mut psbt = {
-        let mut builder = wallet.build_tx();
-        // NOTE: the deposit won't be found by the sequencer if the order isn't correct.
-        builder.ordering(TxOrdering::Untouched);
-        builder.add_recipient(bridge_in_address.script_pubkey(), BRIDGE_IN_AMOUNT);
-        builder.add_data(&op_return_data);
-        builder.fee_rate(fee_rate);
-        builder.finish().expect("valid psbt")
-    };
-    wallet.sign(&mut psbt, Default::default()).unwrap();
-
-    let tx = psbt.extract_tx().expect("valid tx");
-    Ok(tx)
+    // Skip the UTXOs spent by DRTs still in the mempool.
+    build_with_pending_spends(&mut wallet, bitcoind_url, |wallet, spent| {
+        let mut psbt = {
+            let mut builder = wallet.build_tx();
+            builder.unspendable(spent);
+            // NOTE: the deposit won't be found by the sequencer if the order isn't correct.
+            builder.ordering(TxOrdering::Untouched);
+            builder.add_recipient(bridge_in_address.script_pubkey(), BRIDGE_IN_AMOUNT);
+            builder.add_data(&op_return_data);
+            builder.fee_rate(fee_rate);
+            builder.finish().map_err(|_| Error::Wallet)?
+        };
+        wallet
+            .sign(&mut psbt, Default::default())
+            .map_err(|_| Error::Wallet)?;
+
+        let tx = psbt.extract_tx().expect("valid tx");
+        Ok(tx)
+    })
 }
 
 /// Spends the take back script path of the deposit request transaction (DRT).
@@ -144,19 +157,22 @@ fn deposit_request_transaction_inner(
 /// A signed (with the private key) and serialized transaction.
 #[pyfunction]
 pub(crate) fn take_back_transaction(
+    py: Python<'_>,
     address_to_send: String,
     musig_bridge_pk: String,
     bitcoind_url: String,
     bitcoind_user: String,
     bitcoind_password: String,
 ) -> PyResult<Vec<u8>> {
-    let signed_tx = spend_recovery_path_inner(
-        address_to_send.as_str(),
-        musig_bridge_pk.as_str(),
-        bitcoind_url.as_str(),
-        bitcoind_user.as_str(),
-        bitcoind_password.as_str(),
-    )?;
+    let signed_tx = py.allow_threads(|| {
+        spend_recovery_path_inner(
+            address_to_send.as_str(),
+            musig_bridge_pk.as_str(),
+            bitcoind_url.as_str(),
+            bitcoind_user.as_str(),
+            bitcoind_password.as_str(),
+        )
+    })?;
     let signed_tx = serialize(&signed_tx);
     Ok(signed_tx)
 }
@@ -215,18 +231,23 @@ fn spend_recovery_path_inner(
     sync_wallet(&mut wallet, &client)?;
 
     // Spend the recovery path
-    let mut psbt = {
-        let mut builder = wallet.build_tx();
-        builder.policy_path(path, KeychainKind::External);
-        builder.drain_wallet();
-        builder.drain_to(address_to_send.script_pubkey());
-        builder.fee_rate(fee_rate);
-        builder.finish().expect("valid psbt")
-    };
-    wallet.sign(&mut psbt, Default::default()).unwrap();
-
-    let tx = psbt.extract_tx().expect("valid tx");
-    Ok(tx)
+    build_with_pending_spends(&mut wallet, bitcoind_url, |wallet, spent| {
+        let mut psbt = {
+            let mut builder = wallet.build_tx();
+            builder.unspendable(spent);
+            builder.policy_path(path, KeychainKind::External);
+            builder.drain_wallet();
+            builder.drain_to(address_to_send.script_pubkey());
+            builder.fee_rate(fee_rate);
+            builder.finish().map_err(|_| Error::Wallet)?
+        };
+        wallet
+            .sign(&mut psbt, Default::default())
+            .map_err(|_| Error::Wallet)?;
+
+        let tx = psbt.extract_tx().expect("valid tx");
+        Ok(tx)
+    })
 }
 
 /// The descriptor for the bridge-in transaction.
@@ -330,12 +351,15 @@ pub(crate) fn get_recovery_address(index: u32, musig_bridge_pk: String) -> PyRes
 /// The balance in satoshis where 1 BTC = 100_000_000 satoshis.
 #[pyfunction]
 pub(crate) fn get_balance(
+    py: Python<'_>,
     address: String,
     bitcoind_url: String,
     bitcoind_user: String,
     bitcoind_password: String,
 ) -> PyResult<u64> {
-    let balance = get_balance_inner(&address, &bitcoind_url, &bitcoind_user, &bitcoind_password)?;
+    let balance = py.allow_threads(|| {
+        get_balance_inner(&address, &bitcoind_url, &bitcoind_user, &bitcoind_password)
+    })?;
     Ok(balance)
 }
 
@@ -393,19 +417,22 @@ pub(crate) fn get_balance_inner(
 /// The balance in satoshis where 1 BTC = 100_000_000 satoshis.
 #[pyfunction]
 pub(crate) fn get_balance_recovery(
+    py: Python<'_>,
     address: String,
     musig_bridge_pk: String,
     bitcoind_url: String,
     bitcoind_user: String,
     bitcoind_password: String,
 ) -> PyResult<u64> {
-    let balance = get_balance_recovery_inner(
-        &address,
-        &musig_bridge_pk,
-        &bitcoind_url,
-        &bitcoind_user,
-        &bitcoind_password,
-    )?;
+    let balance = py.allow_threads(|| {
+        get_balance_recovery_inner(
+            &address,
+            &musig_bridge_pk,
+            &bitcoind_url,
+            &bitcoind_user,
+            &bitcoind_password,
+        )
+    })?;
     Ok(balance)
 }
 
@@ -539,6 +566,51 @@ mod tests {
         assert_eq!(txid, signed_tx.compute_txid());
     }
 
+    #[tokio::test]
+    async fn concurrent_drts_mempool_accept() {
+        init_logging("drt-tests");
+
+        let bitcoind = BitcoinD::from_downloaded().unwrap();
+        let url = bitcoind.rpc_url();
+        let (user, password) = get_auth(&bitcoind);
+        let client = BitcoinClient::new(url.clone(), user.clone(), password.clone()).unwrap();
+
+        let mut wallet = taproot_wallet().unwrap();
+        let address = wallet.reveal_next_address(KeychainKind::External).address;
+
+        // Mature coinbase UTXOs of 50 BTC, any one of them funds a DRT.
+        mine_blocks(&bitcoind, 4, Some(address)).unwrap();
+        mine_blocks(&bitcoind, 100, None).unwrap();
+        debug!("mined 104 blocks");
+
+        // Both wallets sync the same confirmed UTXOs, the second DRT must not spend the inputs
+        // of the first one.
+        let handles = (0..2)
+            .map(|_| {
+                let (url, user, password) = (url.clone(), user.clone(), password.clone());
+                std::thread::spawn(move || {
+                    deposit_request_transaction_inner(
+                        EL_ADDRESS,
+                        MUSIG_BRIDGE_PK,
+                        &url,
+                        &user,
+                        &password,
+                    )
+                    .unwrap()
+                })
+            })
+            .collect::<Vec<_>>();
+        let txs = handles
+            .into_iter()
+            .map(|handle| handle.join().unwrap())
+            .collect::<Vec<_>>();
+
+        for signed_tx in &txs {
+            let txid = client.send_raw_transaction(signed_tx).await.unwrap();
+            debug!(%txid, "sent drt tx");
+        }
+    }
+
     #[tokio::test]
     async fn recovery_path_mempool_accept() {
         init_logging("recovery-path-tests");
@@ -29,6 +29,9 @@ pub(crate) enum Error {
 
     /// Error with BitcoinD response.
     BitcoinD,
+
+    /// Packed Schnorr precompile input is not a multiple of the record length.
+    SchnorrInput,
 }
 
 /// Converts an `Error` into a `PyErr` to be raised in Python.
@@ -54,6 +57,9 @@ impl From<Error> for PyErr {
                 PyErr::new::<PyTypeError, _>("Could not create RPC client".to_owned())
             }
             Error::BitcoinD => PyErr::new::<PyTypeError, _>("Invalid BitcoinD response".to_owned()),
+            Error::SchnorrInput => {
+                PyErr::new::<PyTypeError, _>("Invalid packed Schnorr input length".to_owned())
+            }
         }
     }
 }
@@ -11,10 +11,10 @@ use drt::{
     deposit_request_transaction, get_balance, get_balance_recovery, get_recovery_address,
     take_back_transaction,
 };
-use schnorr::{sign_schnorr_sig, verify_schnorr_sig};
+use schnorr::{sign_schnorr_sig, sign_schnorr_sigs, verify_schnorr_sig, verify_schnorr_sigs};
 use taproot::{
     convert_to_xonly_pk, drain_wallet, extract_p2tr_pubkey, get_address, get_change_address,
-    musig_aggregate_pks, unspendable_address,
+    musig_aggregate_pks, release_pending_spends, unspendable_address,
 };
 
 /// A Python module implemented in Rust. The name of this function must match
@@ -36,6 +36,9 @@ fn strata_utils(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(get_balance_recovery, m)?)?;
     m.add_function(wrap_pyfunction!(sign_schnorr_sig, m)?)?;
     m.add_function(wrap_pyfunction!(verify_schnorr_sig, m)?)?;
+    m.add_function(wrap_pyfunction!(sign_schnorr_sigs, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_schnorr_sigs, m)?)?;
+    m.add_function(wrap_pyfunction!(release_pending_spends, m)?)?;
 
     Ok(())
 }
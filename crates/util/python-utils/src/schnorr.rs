@@ -7,6 +7,8 @@ use strata_crypto::{
 };
 use strata_primitives::buf::{Buf32, Buf64};
 
+use crate::{constants::SCHNORR_PRECOMPILE_INPUT_LEN, error::Error};
+
 /// Signs a message using the Schnorr signature scheme.
 ///
 /// Generates a Schnorr signature for the given message using the provided secret key.
@@ -66,3 +68,119 @@ pub fn verify_schnorr_sig(sig: &str, msg: &str, pk: &str) -> bool {
 
     verify_schnorr_sig_inner(&sig, &msg, &pk)
 }
+
+/// Signs a batch of messages using the Schnorr signature scheme.
+///
+/// Every message is signed with the same secret key and laid out in the input format expected
+/// by the Schnorr precompile, i.e. `public_key || message_hash || signature`
+/// ([`SCHNORR_PRECOMPILE_INPUT_LEN`] bytes per message). The records are packed back to back
+/// in a single buffer, so that it can be sliced into precompile calldata without further
+/// hex round-trips on the Python side.
+///
+/// # Arguments
+/// * `py` - Python interpreter provided by PyO3 for ensuring thread safety
+/// * `messages` - A list of strings representing the messages to sign, encoded in hexadecimal
+///   format.
+/// * `secret_key` - A string representing the secret key, encoded in hexadecimal format.
+///
+/// # Returns
+/// * The packed precompile inputs, one record per message, in the order of `messages`.
+#[pyfunction]
+pub(crate) fn sign_schnorr_sigs(
+    py: Python,
+    messages: Vec<String>,
+    secret_key: &str,
+) -> PyResult<Py<PyBytes>> {
+    let messages = messages
+        .iter()
+        .map(|msg| Buf32::from_str(msg).expect("invalid message hash"))
+        .collect::<Vec<_>>();
+    let sk = Buf32::from_str(secret_key).expect("invalid secret key");
+
+    // Signing is CPU-bound, so release the GIL for large batches.
+    let packed = py.allow_threads(|| sign_schnorr_sigs_inner(&messages, &sk));
+
+    Ok(PyBytes::new(py, &packed).into())
+}
+
+/// Signs a batch of messages and packs them as Schnorr precompile inputs.
+fn sign_schnorr_sigs_inner(messages: &[Buf32], sk: &Buf32) -> Vec<u8> {
+    let sk_inner = SecretKey::from_slice(sk.as_slice()).expect("invalid secret key");
+    let keypair = Keypair::from_secret_key(SECP256K1, &sk_inner);
+    let x_only_pubkey = keypair.x_only_public_key().0.serialize();
+
+    let mut packed = Vec::with_capacity(messages.len() * SCHNORR_PRECOMPILE_INPUT_LEN);
+    for msg in messages {
+        let sig = sign_schnorr_sig_inner(msg, sk);
+        packed.extend_from_slice(&x_only_pubkey);
+        packed.extend_from_slice(msg.as_slice());
+        packed.extend_from_slice(sig.as_slice());
+    }
+    packed
+}
+
+/// Verifies a batch of Schnorr signatures.
+///
+/// Takes the packed precompile inputs as returned by [`sign_schnorr_sigs`], i.e. a sequence of
+/// `public_key || message_hash || signature` records of [`SCHNORR_PRECOMPILE_INPUT_LEN`] bytes
+/// each.
+///
+/// # Arguments
+/// * `py` - Python interpreter provided by PyO3 for ensuring thread safety
+/// * `inputs` - The packed precompile inputs.
+///
+/// # Returns
+///
+/// One byte per record, `0x01` if the signature is valid and `0x00` otherwise. This matches the
+/// output of the Schnorr precompile, so results can be compared with the on-chain ones directly.
+#[pyfunction]
+pub(crate) fn verify_schnorr_sigs(py: Python, inputs: &[u8]) -> PyResult<Py<PyBytes>> {
+    let results = py.allow_threads(|| verify_schnorr_sigs_inner(inputs))?;
+    Ok(PyBytes::new(py, &results).into())
+}
+
+/// Verifies packed Schnorr precompile inputs, returning one result byte per record.
+fn verify_schnorr_sigs_inner(inputs: &[u8]) -> Result<Vec<u8>, Error> {
+    if inputs.len() % SCHNORR_PRECOMPILE_INPUT_LEN != 0 {
+        return Err(Error::SchnorrInput);
+    }
+
+    let results = inputs
+        .chunks_exact(SCHNORR_PRECOMPILE_INPUT_LEN)
+        .map(|record| {
+            let pk = Buf32::new(record[0..32].try_into().unwrap());
+            let msg = Buf32::new(record[32..64].try_into().unwrap());
+            let sig = Buf64::new(record[64..128].try_into().unwrap());
+            verify_schnorr_sig_inner(&sig, &msg, &pk) as u8
+        })
+        .collect();
+    Ok(results)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn sign_verify_schnorr_sigs() {
+        let sk = Buf32::new([1u8; 32]);
+        let messages = (0..4u8).map(|i| Buf32::new([i; 32])).collect::<Vec<_>>();
+
+        let mut packed = sign_schnorr_sigs_inner(&messages, &sk);
+        assert_eq!(packed.len(), messages.len() * SCHNORR_PRECOMPILE_INPUT_LEN);
+        assert_eq!(verify_schnorr_sigs_inner(&packed).unwrap(), vec![1u8; 4]);
+
+        // Corrupt the message hash of the second record.
+        packed[SCHNORR_PRECOMPILE_INPUT_LEN + 32] ^= 0xff;
+        assert_eq!(
+            verify_schnorr_sigs_inner(&packed).unwrap(),
+            vec![1, 0, 1, 1]
+        );
+    }
+
+    #[test]
+    fn verify_schnorr_sigs_invalid_length() {
+        let inputs = vec![0u8; SCHNORR_PRECOMPILE_INPUT_LEN + 1];
+        assert!(verify_schnorr_sigs_inner(&inputs).is_err());
+    }
+}
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import flexitest
+
+from envs import bench, net_settings, testenv
+from utils import prove_checkpoint, wait_until, wait_until_with_value
+
+PREMINE_BLOCKS = 101
+POLL_INTERVAL_SECS = 0.1
+
+
+class SlotClock:
+    """
+    Records when the sequencer first reports each L2 slot as its tip, on a background thread,
+    so the end of an epoch can be timed after the fact.
+    """
+
+    def __init__(self, seqrpc):
+        self.seqrpc = seqrpc
+        self.seen: dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+        self._thr.start()
+
+    def _run(self):
+        while not self._stop.wait(POLL_INTERVAL_SECS):
+            try:
+                slot = self.seqrpc.strata_clientStatus()["chain_tip_slot"]
+            except Exception:
+                continue
+            self.seen.setdefault(slot, time.perf_counter())
+
+    def stop(self):
+        self._stop.set()
+        self._thr.join()
+
+
+@flexitest.register
+class CheckpointFinalityBench(bench.StrataBenchmark):
+    """
+    Proves and submits K consecutive checkpoints and times, for each of them, the end of its
+    epoch to `strata_getCheckpointInfo` returning it, the proof, the publication on L1 (a new
+    `last_published_txid`) and the advance of `finalized_block_id` to its last block.
+
+    Parameters: `BENCH_CHECKPOINTS`, and `BENCH_EPOCH_SLOTS` and `BENCH_REORG_SAFE_DEPTH`,
+    which set the rollup params of the env. Sweeping them means running the benchmark once per
+    value.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        settings = net_settings.get_fast_batch_settings()
+        settings.genesis_trigger = PREMINE_BLOCKS + 5
+        settings.epoch_slots = int(bench.env_param("BENCH_EPOCH_SLOTS", settings.epoch_slots))
+        settings.l1_reorg_safe_depth = int(bench.env_param("BENCH_REORG_SAFE_DEPTH", 4))
+        # Without a timeout the sequencer never publishes a checkpoint without its proof.
+        settings.proof_timeout = None
+        self.labels = {
+            "epoch_slots": settings.epoch_slots,
+            "reorg_safe_depth": settings.l1_reorg_safe_depth,
+        }
+        ctx.set_env(testenv.BasicEnvConfig(PREMINE_BLOCKS, rollup_settings=settings))
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.n_checkpoints = int(bench.env_param("BENCH_CHECKPOINTS", 5))
+        self.seqrpc = ctx.get_service("sequencer").create_rpc()
+        self.prover_rpc = ctx.get_service("prover_client").create_rpc()
+        # Blocks are mined every `BLOCK_GENERATION_INTERVAL_SECS`, leave plenty of margin.
+        self.finality_timeout = 30 + 5 * self.labels["reorg_safe_depth"]
+
+    def _checkpoint(self, idx: int, clock: SlotClock):
+        seqrpc = self.seqrpc
+        info = wait_until_with_value(
+            lambda: seqrpc.strata_getCheckpointInfo(idx),
+            predicate=lambda v: v is not None,
+            error_with=f"Could not find checkpoint info for index {idx}",
+            timeout=60 + self.labels["epoch_slots"] * 5,
+            step=POLL_INTERVAL_SECS,
+        )
+        info_at = time.perf_counter()
+        # Missed when the epoch ended before the clock started, or between two of its polls.
+        epoch_end = clock.seen.get(info["l2_range"][1])
+        last_published_txid = seqrpc.strata_l1status()["last_published_txid"]
+
+        proof = prove_checkpoint(idx, self.prover_rpc)
+        proved_at = time.perf_counter()
+        seqrpc.strataadmin_submitCheckpointProof(idx, proof)
+
+        wait_until(
+            lambda: seqrpc.strata_l1status()["last_published_txid"] != last_published_txid,
+            error_with=f"Checkpoint {idx} was not published to bitcoin",
+            timeout=30,
+            step=POLL_INTERVAL_SECS,
+        )
+        published_at = time.perf_counter()
+
+        wait_until(
+            lambda: seqrpc.strata_syncStatus()["finalized_block_id"] == info["l2_blockid"],
+            error_with=f"Checkpoint {idx} not finalized",
+            timeout=self.finality_timeout,
+            step=POLL_INTERVAL_SECS,
+        )
+        finalized_at = time.perf_counter()
+
+        self.record("proof", (proved_at - info_at) * 1000, "ms", **self.labels)
+        self.record("l1_publish", (published_at - proved_at) * 1000, "ms", **self.labels)
+        self.record("finalization", (finalized_at - published_at) * 1000, "ms", **self.labels)
+        if epoch_end is None:
+            self.warning(f"end of the epoch of checkpoint {idx} not seen, not timed from it")
+            return
+        self.record("checkpoint_info", (info_at - epoch_end) * 1000, "ms", **self.labels)
+        self.record("end_to_end", (finalized_at - epoch_end) * 1000, "ms", **self.labels)
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        clock = SlotClock(self.seqrpc)
+        try:
+            start = i * self.n_checkpoints
+            for idx in range(start, start + self.n_checkpoints):
+                self._checkpoint(idx, clock)
+                self.info(f"checkpoint {idx} finalized")
+        finally:
+            clock.stop()
@@ -0,0 +1,114 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import flexitest
+
+from envs import bench, testenv
+from utils import get_bridge_pubkey
+from utils.constants import SATS_TO_WEI
+
+POLL_INTERVAL_SECS = 0.2
+# How long a deposit may take from broadcast to EL credit before the run gives up on it.
+DEPOSIT_TIMEOUT_SECS = 180
+
+# Stages of a deposit, in the order they happen.
+STAGES = ["l1_confirmed", "seq_detected", "el_credited"]
+
+
+@dataclass
+class PendingDeposit:
+    el_address: str
+    txid: str
+    broadcast_at: float
+    l1_confirmed: Optional[float] = None
+    seq_detected: Optional[float] = None
+    el_credited: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.el_credited is not None
+
+
+@flexitest.register
+class DepositPipelineBench(bench.StrataBenchmark, testenv.BridgeTestBase):
+    """
+    Submits DRTs at a controlled rate, each to a fresh EL address, and times every stage of
+    each deposit: broadcast to L1 confirmation, to the deposit showing up in
+    `strata_getCurrentDeposits` and to the EL address being credited. Records the latency of
+    each stage since broadcast and the sustained deposits per minute.
+
+    Deposit entries are only known by index, so they are matched to the DRTs in the order the
+    DRTs got confirmed.
+
+    Parameters: `BENCH_DEPOSITS`, `BENCH_DEPOSIT_RATE` (per minute) and `BENCH_N_OPERATORS`,
+    which sets the env of the benchmark.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        self.n_operators = int(bench.env_param("BENCH_N_OPERATORS", 2))
+        ctx.set_env(testenv.BasicEnvConfig(101, n_operators=self.n_operators))
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.n_deposits = int(bench.env_param("BENCH_DEPOSITS", 20))
+        self.rate = bench.env_param("BENCH_DEPOSIT_RATE", 12)
+        self.bridge_pk = get_bridge_pubkey(self.seqrpc)
+        self.credit = ctx.env.rollup_cfg().deposit_amount * SATS_TO_WEI
+
+    def _poll(self, pending: list[PendingDeposit], known_ids: set[int]):
+        now = time.perf_counter()
+        for d in pending:
+            if d.l1_confirmed is None:
+                tx = self.btcrpc.proxy.getrawtransaction(d.txid, True)
+                if tx.get("confirmations", 0) > 0:
+                    d.l1_confirmed = now
+
+        new_ids = set(self.seqrpc.strata_getCurrentDeposits()) - known_ids
+        known_ids |= new_ids
+        confirmed = sorted(
+            (d for d in pending if d.seq_detected is None and d.l1_confirmed is not None),
+            key=lambda d: d.l1_confirmed,
+        )
+        for d in confirmed[: len(new_ids)]:
+            d.seq_detected = now
+
+        for d in pending:
+            if not d.done and d.seq_detected is not None:
+                balance = int(self.rethrpc.eth_getBalance(f"0x{d.el_address}"), 16)
+                if balance >= self.credit:
+                    d.el_credited = now
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        known_ids = set(self.seqrpc.strata_getCurrentDeposits())
+        pending: list[PendingDeposit] = []
+
+        start = time.perf_counter()
+        deadline = start + self.n_deposits * 60 / self.rate + DEPOSIT_TIMEOUT_SECS
+        while time.perf_counter() < deadline:
+            due = int((time.perf_counter() - start) * self.rate / 60) + 1
+            while len(pending) < min(due, self.n_deposits):
+                el_address = ctx.env.gen_el_address()
+                txid = self.send_drt(el_address, self.bridge_pk)
+                pending.append(PendingDeposit(el_address, txid, time.perf_counter()))
+
+            self._poll(pending, known_ids)
+            if len(pending) == self.n_deposits and all(d.done for d in pending):
+                break
+            time.sleep(POLL_INTERVAL_SECS)
+
+        labels = {"n_operators": self.n_operators, "rate": self.rate}
+        for d in pending:
+            for stage in STAGES:
+                at = getattr(d, stage)
+                if at is not None:
+                    self.record(stage, (at - d.broadcast_at) * 1000, "ms", **labels)
+
+        credited = [d for d in pending if d.done]
+        self.record("lost_deposits", len(pending) - len(credited), "deposits", **labels)
+        if credited:
+            span = max(d.el_credited for d in credited) - start
+            self.record("deposits_per_minute", len(credited) * 60 / span, "deposits/min", **labels)
+        self.info(f"{len(credited)}/{len(pending)} deposits credited")
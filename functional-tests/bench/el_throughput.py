@@ -0,0 +1,66 @@
+import flexitest
+from web3 import Web3
+
+from envs import bench
+from utils.el_load import TransferLoad, bench_accounts, fund_accounts
+
+# Offered load of each step of the sweep, in tx/s.
+DEFAULT_RATES = [10.0, 25.0, 50.0, 100.0, 200.0, 400.0]
+# A step saturates the sequencer when less than this share of the offered load is included.
+SATURATION_RATIO = 0.9
+
+
+@flexitest.register
+class ElThroughputBench(bench.StrataBenchmark):
+    """
+    Sustained value transfers into the sequencer's reth from many pre-funded accounts, at
+    increasing rates. For each rate it records the accepted TPS, the submit to inclusion
+    latency and the tx count and gas of every block, then the saturation point of the sweep,
+    i.e. the highest rate at which the offered load was still included.
+
+    Parameters: `BENCH_EL_RATES` (comma-separated tx/s), `BENCH_EL_STEP_SECS` and
+    `BENCH_EL_ACCOUNTS`.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env("basic")
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.rates = bench.env_list("BENCH_EL_RATES", DEFAULT_RATES)
+        self.step_secs = bench.env_param("BENCH_EL_STEP_SECS", 20)
+        n_accounts = int(bench.env_param("BENCH_EL_ACCOUNTS", 128))
+
+        reth = ctx.get_service("reth")
+        web3: Web3 = reth.create_web3()
+        accounts = bench_accounts(web3, n_accounts)
+        fund_accounts(web3, accounts, Web3.to_wei(10, "ether"))
+        self.load = TransferLoad(web3, reth.heads_hub(), accounts)
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        saturation_rate = None
+        for rate in self.rates:
+            res = self.load.run(rate, self.step_secs)
+            self.info(
+                f"rate {rate} tx/s: {res.included}/{res.submitted} included, "
+                f"{res.rejected} rejected, {res.accepted_tps:.1f} tx/s accepted"
+            )
+
+            self.record("accepted_tps", res.accepted_tps, "tx/s", rate=rate)
+            self.record("rejected_txs", res.rejected, "txs", rate=rate)
+            self.record("dropped_txs", res.dropped, "txs", rate=rate)
+            for latency in res.latencies.values():
+                self.record("inclusion_latency", latency * 1000, "ms", rate=rate)
+            for blk in res.blocks:
+                self.record("block_tx_count", blk.tx_count, "txs", rate=rate)
+                self.record("block_gas_used", blk.gas_used, "gas", rate=rate)
+
+            if res.included < SATURATION_RATIO * res.submitted or (
+                res.accepted_tps < SATURATION_RATIO * rate
+            ):
+                break
+            saturation_rate = rate
+
+        self.record("saturation_rate", saturation_rate or 0, "tx/s")
@@ -0,0 +1,95 @@
+import time
+from typing import Optional
+
+import flexitest
+
+from envs import bench
+from utils import wait_until
+
+# L2 blocks the sequencer builds while the fullnode is down, one step of the sweep each.
+DEFAULT_CHAIN_LENGTHS = [30, 100, 300]
+POLL_INTERVAL_SECS = 0.1
+# Per L2 block to sync, on top of a fixed margin.
+SYNC_TIMEOUT_PER_BLOCK_SECS = 1
+
+
+@flexitest.register
+class FullnodeSyncBench(bench.StrataBenchmark):
+    """
+    Stops the fullnode of the hub topology, lets the sequencer build some more L2 blocks, then
+    starts the fullnode again and times how fast it syncs them from `--sequencer-rpc`, and how
+    long its reth takes to match the `eth_blockNumber` the sequencer's reth had at the
+    restart. Every length of the sweep gives a point of the catch-up curve.
+
+    Parameters: `BENCH_SYNC_LENGTHS` (comma-separated numbers of L2 blocks).
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env("hub1")
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.lengths = bench.env_list("BENCH_SYNC_LENGTHS", DEFAULT_CHAIN_LENGTHS)
+        self.seqrpc = ctx.get_service("seq_node").create_rpc()
+        self.seq_rethrpc = ctx.get_service("seq_reth").create_rpc()
+        self.fullnode = ctx.get_service("follower_1_node")
+        self.fn_rethrpc = ctx.get_service("follower_1_reth").create_rpc()
+
+    def _fullnode_slot(self, fnrpc) -> Optional[int]:
+        try:
+            return fnrpc.strata_clientStatus()["chain_tip_slot"]
+        except Exception:
+            return None
+
+    def _step(self, length: int):
+        fnrpc = self.fullnode.create_rpc()
+        start_slot = self._fullnode_slot(fnrpc) or 0
+        self.fullnode.stop()
+
+        target_slot = start_slot + length
+        wait_until(
+            lambda: self.seqrpc.strata_clientStatus()["chain_tip_slot"] >= target_slot,
+            error_with=f"Sequencer did not reach slot {target_slot}",
+            timeout=length * 10 + 60,
+            step=1,
+        )
+        target_slot = self.seqrpc.strata_clientStatus()["chain_tip_slot"]
+        target_el_block = int(self.seq_rethrpc.eth_blockNumber(), 16)
+
+        self.fullnode.start()
+        start = time.perf_counter()
+        fnrpc = self.fullnode.create_rpc()
+        synced_at = reth_matched_at = None
+        deadline = start + 60 + length * SYNC_TIMEOUT_PER_BLOCK_SECS
+        while time.perf_counter() < deadline and (synced_at is None or reth_matched_at is None):
+            now = time.perf_counter()
+            if synced_at is None:
+                slot = self._fullnode_slot(fnrpc)
+                if slot is not None and slot >= target_slot:
+                    synced_at = now
+            if reth_matched_at is None:
+                try:
+                    if int(self.fn_rethrpc.eth_blockNumber(), 16) >= target_el_block:
+                        reth_matched_at = now
+                except Exception:
+                    pass
+            time.sleep(POLL_INTERVAL_SECS)
+
+        labels = {"chain_length": length}
+        blocks = target_slot - start_slot
+        if synced_at is None:
+            self.warning(f"fullnode did not sync up to slot {target_slot}")
+        else:
+            self.record("sync_time", (synced_at - start) * 1000, "ms", **labels)
+            self.record("sync_blocks_per_sec", blocks / (synced_at - start), "blocks/s", **labels)
+            self.info(f"synced {blocks} blocks in {synced_at - start:.1f}s")
+        if reth_matched_at is None:
+            self.warning(f"follower reth did not reach block {target_el_block}")
+        else:
+            self.record("reth_match_time", (reth_matched_at - start) * 1000, "ms", **labels)
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        for length in self.lengths:
+            self._step(length)
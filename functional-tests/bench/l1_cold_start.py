@@ -0,0 +1,114 @@
+from typing import Optional
+
+import flexitest
+
+from envs import bench, testenv
+from factory.logtail import LogExpectation
+from utils import RollupParamsSettings
+
+# Blocks mined while the sequencer is down, before timing its restart.
+DEFAULT_DOWNTIME_BLOCKS = 500
+
+
+@flexitest.register
+class L1ColdStartBench(bench.StrataBenchmark):
+    """
+    Starts the sequencer against a deep pre-existing chain, with the genesis trigger close to
+    the tip and thus far above the horizon, and times since the sequencer started: the scan
+    from the horizon up to the genesis trigger height, genesis, and reaching the bitcoind tip.
+    Then stops the sequencer, mines more blocks and times how long the restarted sequencer
+    takes to catch up again.
+
+    The pre-mined chains are saved as chain templates and reused by later runs. Milestones are
+    timed from the timestamps of the sequencer log lines, so they don't depend on when the
+    benchmark started looking.
+
+    Parameters: `BENCH_CHAIN_LENGTH` (blocks pre-mined, sets the env of the benchmark, e.g.
+    1000, 10000 or 50000) and `BENCH_DOWNTIME_BLOCKS`.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        self.chain_length = int(bench.env_param("BENCH_CHAIN_LENGTH", 1000))
+        settings = RollupParamsSettings.new_default()
+        # Horizon is half the genesis trigger height.
+        settings.genesis_trigger = self.chain_length - 10
+        ctx.set_env(
+            testenv.BasicEnvConfig(
+                self.chain_length,
+                rollup_settings=settings,
+                auto_generate_blocks=False,
+                use_chain_template=True,
+            )
+        )
+
+    def setup(self, ctx: flexitest.RunContext):
+        downtime_blocks = bench.env_param("BENCH_DOWNTIME_BLOCKS", DEFAULT_DOWNTIME_BLOCKS)
+        self.downtime_blocks = int(downtime_blocks)
+        self.seq = ctx.get_service("sequencer")
+        btc = ctx.get_service("bitcoin")
+        self.btcrpc = btc.create_pooled_rpc().for_wallet(btc.get_prop("walletname"))
+        self.cfg = ctx.env.rollup_cfg()
+
+    def _accepted(self, height: int, from_start: bool = False) -> LogExpectation:
+        """Expects the L1 reader accepting the block at `height`."""
+        return self.seq.log_tailer().expect(
+            rf"accepted new block.*fetch_height={height}\b", from_start=from_start
+        )
+
+    def _since_start(self, exp: LogExpectation, timeout: float, what: str) -> Optional[float]:
+        """
+        Waits for `exp`, returns how long after the last start of the sequencer its line was
+        logged, in secs, or None if it never was.
+        """
+        try:
+            exp.wait(timeout)
+        except AssertionError:
+            self.warning(f"sequencer did not log {what} within {timeout:.0f}s")
+            return None
+        if exp.logged_at is None:
+            self.warning(f"no timestamp on the log line of {what}")
+            return None
+        return exp.logged_at - self.seq.started_at
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        labels = {"chain_length": self.chain_length}
+        tip = self.btcrpc.getblockcount()
+        timeout = 300 + tip / 50
+
+        # The sequencer was started with the env, the lines may be logged already. The L1
+        # status jumps to the tip once the reader is done, so the end of the horizon scan is
+        # only visible in the log.
+        expected = {
+            "tip_catch_up": self._accepted(tip, from_start=True),
+            "horizon_scan": self._accepted(self.cfg.genesis_l1_height, from_start=True),
+            "genesis": self.seq.log_tailer().expect(
+                r"finished genesis insertions", from_start=True
+            ),
+        }
+        seen = {}
+        for milestone, exp in expected.items():
+            secs = self._since_start(exp, timeout, milestone)
+            if secs is not None:
+                seen[milestone] = secs
+                self.record(milestone, secs * 1000, "ms", **labels)
+        if "tip_catch_up" not in seen:
+            return
+        scanned = tip - self.cfg.horizon_l1_height
+        self.record("scan_blocks_per_sec", scanned / seen["tip_catch_up"], "blocks/s", **labels)
+
+        # Restart after downtime, the blocks mined meanwhile are all new to the sequencer.
+        self.seq.stop()
+        addr = self.btcrpc.getnewaddress()
+        for mined in range(0, self.downtime_blocks, 500):
+            self.btcrpc.generatetoaddress(min(500, self.downtime_blocks - mined), addr)
+        tip = self.btcrpc.getblockcount()
+        caught_up = self._accepted(tip)
+        self.seq.start()
+
+        labels["downtime_blocks"] = self.downtime_blocks
+        secs = self._since_start(caught_up, timeout, f"the restart reaching the L1 tip {tip}")
+        if secs is not None:
+            self.record("restart_catch_up", secs * 1000, "ms", **labels)
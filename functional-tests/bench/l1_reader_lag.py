@@ -0,0 +1,178 @@
+import threading
+import time
+
+import flexitest
+
+from envs import bench, testenv
+from factory.btcrpc import BitcoindRpc
+from utils import wait_until
+
+# Mining rates of the sweep, in blocks/s.
+DEFAULT_RATES = [1.0, 2.0, 5.0, 10.0, 20.0]
+# Transactions padding every mined block, each value is swept over all the rates.
+DEFAULT_PADDING = [0, 200]
+# UTXOs made at setup so padding transactions don't chain on unconfirmed change.
+PADDING_UTXOS = 2000
+PADDING_AMOUNT_BTC = 0.0001
+POLL_INTERVAL_SECS = 0.05
+# How long the reader may take to reach the tip once mining stops.
+CATCH_UP_TIMEOUT_SECS = 60
+# A step is sustained when the reader ingests at least this share of the mining rate.
+SUSTAINED_RATIO = 0.9
+# Below this share of the nominal rate, bitcoind rather than the reader limits the sweep.
+MINED_RATIO = 0.8
+
+
+class L1LagProbe:
+    """
+    Polls the bitcoind height and `strata_l1status` of the sequencer on a background thread,
+    recording when the reader first reported each height and the lag behind the tip.
+    """
+
+    def __init__(self, btcrpc: BitcoindRpc, seqrpc):
+        self.btcrpc = btcrpc
+        self.seqrpc = seqrpc
+        self.ingested_at: dict[int, float] = {}
+        self.lag_blocks: list[int] = []
+        self.staleness_ms: list[float] = []
+        self.cur_height = 0
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+        self._thr.start()
+
+    def _run(self):
+        while not self._stop.wait(POLL_INTERVAL_SECS):
+            try:
+                tip = self.btcrpc.getblockcount()
+                l1 = self.seqrpc.strata_l1status()
+            except Exception:
+                continue
+            now = time.perf_counter()
+            self.cur_height = l1["cur_height"]
+            self.ingested_at.setdefault(self.cur_height, now)
+            self.lag_blocks.append(tip - self.cur_height)
+            self.staleness_ms.append(time.time() * 1000 - l1["last_update"])
+
+    def stop(self):
+        self._stop.set()
+        self._thr.join()
+
+
+@flexitest.register
+class L1ReaderLagBench(bench.StrataBenchmark):
+    """
+    Mines at increasing rates, with blocks padded by many wallet transactions, and tracks how
+    far `strata_l1status` of the sequencer lags behind the bitcoind tip, in blocks and by the
+    age of its `last_update`. Records the ingestion latency of every block, the ingestion
+    rate of the reader and the highest mining rate it sustained, as actually mined. The sweep
+    stops early when bitcoind can't mine at the requested rate.
+
+    Parameters: `BENCH_L1_RATES` (comma-separated blocks/s), `BENCH_L1_PADDING`
+    (comma-separated txs per block) and `BENCH_L1_STEP_SECS`.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env(testenv.BasicEnvConfig(101, auto_generate_blocks=False))
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.rates = bench.env_list("BENCH_L1_RATES", DEFAULT_RATES)
+        self.paddings = bench.env_list("BENCH_L1_PADDING", DEFAULT_PADDING)
+        self.step_secs = bench.env_param("BENCH_L1_STEP_SECS", 15)
+
+        btc = ctx.get_service("bitcoin")
+        self.seqrpc = ctx.get_service("sequencer").create_rpc()
+        self.btcrpc: BitcoindRpc = btc.create_pooled_rpc().for_wallet(btc.get_prop("walletname"))
+        self.addr = self.btcrpc.getnewaddress()
+
+        wait_until(
+            lambda: self.seqrpc.strata_protocolVersion() is not None,
+            error_with="Sequencer did not start on time",
+        )
+        if max(self.paddings) > 0:
+            outputs = {self.btcrpc.getnewaddress(): 0.01 for _ in range(PADDING_UTXOS)}
+            self.btcrpc.sendmany("", outputs)
+            self.btcrpc.generatetoaddress(1, self.addr)
+
+    def _pad(self, n_txs: int):
+        calls = [("sendtoaddress", [self.addr, PADDING_AMOUNT_BTC]) for _ in range(n_txs)]
+        self.btcrpc.batch(calls)
+
+    def _step(self, rate: float, padding: int) -> tuple[float, bool]:
+        """
+        Mines at `rate` for a step, returns the rate actually mined and whether the reader kept
+        up with it.
+        """
+        probe = L1LagProbe(self.btcrpc, self.seqrpc)
+        start_height = self.btcrpc.getblockcount()
+        mined_at: dict[int, float] = {}
+
+        start = time.perf_counter()
+        n_blocks = max(int(rate * self.step_secs), 1)
+        for i in range(n_blocks):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if padding > 0:
+                self._pad(padding)
+            self.btcrpc.generatetoaddress(1, self.addr)
+            mined_at[start_height + i + 1] = time.perf_counter()
+        mining_secs = time.perf_counter() - start
+        tip = start_height + n_blocks
+
+        caught_up = True
+        try:
+            wait_until(
+                lambda: probe.cur_height >= tip,
+                error_with="L1 reader did not reach the tip",
+                timeout=CATCH_UP_TIMEOUT_SECS,
+                step=POLL_INTERVAL_SECS,
+            )
+        except AssertionError:
+            caught_up = False
+        probe.stop()
+
+        labels = {"rate": rate, "padding": padding}
+        # Heights may be skipped between two polls, a block counts as ingested as soon as any
+        # later height is.
+        ingested = sorted(probe.ingested_at.items())
+        for height, at in mined_at.items():
+            seen = next((t for h, t in ingested if h >= height), None)
+            if seen is not None:
+                self.record("ingestion_latency", max(seen - at, 0) * 1000, "ms", **labels)
+        for lag in probe.lag_blocks:
+            self.record("lag_blocks", lag, "blocks", **labels)
+        for staleness in probe.staleness_ms:
+            self.record("last_update_age", staleness, "ms", **labels)
+
+        mined_rate = n_blocks / mining_secs
+        reached = [t for h, t in ingested if h >= tip]
+        ingest_secs = (reached[0] if reached else time.perf_counter()) - start
+        ingested_blocks = min(probe.cur_height, tip) - start_height
+        ingest_rate = ingested_blocks / ingest_secs
+        self.record("mined_blocks_per_sec", mined_rate, "blocks/s", **labels)
+        self.record("ingested_blocks_per_sec", ingest_rate, "blocks/s", **labels)
+        self.info(
+            f"rate {rate}, padding {padding}: mined {mined_rate:.2f} blocks/s, "
+            f"ingested {ingest_rate:.2f} blocks/s"
+        )
+        return mined_rate, caught_up and ingest_rate >= SUSTAINED_RATIO * mined_rate
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        for padding in self.paddings:
+            max_sustained = 0.0
+            for rate in self.rates:
+                mined_rate, sustained = self._step(rate, padding)
+                if not sustained:
+                    break
+                max_sustained = mined_rate
+                if mined_rate < MINED_RATIO * rate:
+                    self.record("miner_limited", rate, "blocks/s", padding=padding)
+                    self.warning(
+                        f"only mined {mined_rate:.2f} blocks/s for rate {rate} (padding "
+                        f"{padding}), stopping the sweep"
+                    )
+                    break
+            self.record("max_sustained_rate", max_sustained, "blocks/s", padding=padding)
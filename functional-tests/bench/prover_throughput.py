@@ -0,0 +1,194 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import flexitest
+
+from envs import bench, net_settings, testenv
+from factory.resources import ResourceSampler
+from utils import bytes_to_big_endian, el_slot_to_block_id, wait_until
+from utils.constants import DEFAULT_PROVER_LOOP_INTERVAL_MSEC, DEFAULT_PROVER_NATIVE_WORKERS
+
+POLL_INTERVAL_SECS = 0.2
+# Blocks covered by each L1, EL and L2 proving task.
+TASK_SPAN = 2
+TASK_TIMEOUT_SECS = 1800
+
+STATUS_IN_PROGRESS = "ProvingInProgress"
+STATUS_COMPLETED = "Completed"
+STATUS_FAILED = "Failed"
+
+
+@dataclass
+class ProvingTask:
+    kind: str
+    key: dict
+    submitted_at: float
+    started_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    status: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (STATUS_COMPLETED, STATUS_FAILED)
+
+
+@flexitest.register
+class ProverThroughputBench(bench.StrataBenchmark):
+    """
+    Dispatches many concurrent proving tasks of every kind (L1 batch, EL blocks, L2 batch and
+    checkpoint) and polls `dev_strata_getTaskStatus` to split the time of each task between
+    waiting in the queue (including on its dependencies) and being proven. Records proofs per
+    minute and the CPU usage of the prover client while it works.
+
+    Parameters: `BENCH_PROVER_TASKS` (per kind), and `BENCH_PROVER_WORKERS` and
+    `BENCH_PROVER_LOOP_INTERVAL` (ms), which set how the prover client of the env is started.
+    Sweeping them means running the benchmark once per value.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        self.labels = {
+            "native_workers": int(
+                bench.env_param("BENCH_PROVER_WORKERS", DEFAULT_PROVER_NATIVE_WORKERS)
+            ),
+            "loop_interval": int(
+                bench.env_param("BENCH_PROVER_LOOP_INTERVAL", DEFAULT_PROVER_LOOP_INTERVAL_MSEC)
+            ),
+        }
+        ctx.set_env(
+            testenv.BasicEnvConfig(
+                101,
+                rollup_settings=net_settings.get_fast_batch_settings(),
+                prover_native_workers=self.labels["native_workers"],
+                prover_loop_interval=self.labels["loop_interval"],
+            )
+        )
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.n_tasks = int(bench.env_param("BENCH_PROVER_TASKS", 4))
+        self.prover = ctx.get_service("prover_client")
+        self.prover_rpc = self.prover.create_rpc()
+        self.seqrpc = ctx.get_service("sequencer").create_rpc()
+        self.rethrpc = ctx.get_service("reth").create_rpc()
+        self.btcrpc = ctx.get_service("bitcoin").create_pooled_rpc()
+
+        # Wait for enough blocks and checkpoints for all the tasks to be dispatched.
+        n_blocks = self.n_tasks * TASK_SPAN + 1
+
+        def _ready() -> bool:
+            ckp_idx = self.seqrpc.strata_getLatestCheckpointIndex()
+            return (
+                self.seqrpc.strata_clientStatus()["chain_tip_slot"] >= n_blocks
+                and ckp_idx is not None
+                and ckp_idx >= self.n_tasks - 1
+            )
+
+        wait_until(
+            _ready,
+            error_with="Not enough L2 blocks and checkpoints to prove",
+            timeout=300,
+            step=1,
+        )
+
+    def _ranges(self) -> list[tuple[int, int]]:
+        return [(1 + i * TASK_SPAN, (i + 1) * TASK_SPAN) for i in range(self.n_tasks)]
+
+    def _l2_blkid(self, idx: int) -> str:
+        return self.seqrpc.strata_getHeadersAtIdx(idx)[0]["block_id"]
+
+    def _l1_blkid(self, height: int) -> str:
+        return bytes_to_big_endian(self.btcrpc.getblockhash(height))
+
+    def _dispatch_all(self) -> list[ProvingTask]:
+        """Dispatches the tasks of every kind back to back, returns the main task of each."""
+        calls = []
+        for start, end in self._ranges():
+            calls.append(
+                (
+                    "l1_batch",
+                    self.prover_rpc.dev_strata_proveL1Batch,
+                    ((self._l1_blkid(start), self._l1_blkid(end)),),
+                )
+            )
+            calls.append(
+                (
+                    "el_blocks",
+                    self.prover_rpc.dev_strata_proveElBlocks,
+                    (
+                        (
+                            el_slot_to_block_id(self.rethrpc, start),
+                            el_slot_to_block_id(self.rethrpc, end),
+                        ),
+                    ),
+                )
+            )
+            calls.append(
+                (
+                    "l2_batch",
+                    self.prover_rpc.dev_strata_proveL2Batch,
+                    ([(self._l2_blkid(start), self._l2_blkid(end))],),
+                )
+            )
+        for idx in range(self.n_tasks):
+            calls.append(("checkpoint", self.prover_rpc.dev_strata_proveCheckpoint, (idx,)))
+
+        tasks = []
+        for kind, method, args in calls:
+            submitted_at = time.perf_counter()
+            keys = method(*args)
+            tasks.append(ProvingTask(kind, keys[0], submitted_at))
+        return tasks
+
+    def _poll(self, tasks: list[ProvingTask]):
+        for task in tasks:
+            if task.done:
+                continue
+            status = self.prover_rpc.dev_strata_getTaskStatus(task.key)
+            now = time.perf_counter()
+            if status == STATUS_IN_PROGRESS and task.started_at is None:
+                task.started_at = now
+            elif status in (STATUS_COMPLETED, STATUS_FAILED):
+                task.ended_at = now
+            task.status = status
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        sampler = ResourceSampler({"prover_client": self.prover}, interval=1)
+        sampler.start()
+
+        start = time.perf_counter()
+        tasks = self._dispatch_all()
+        deadline = start + TASK_TIMEOUT_SECS
+        while time.perf_counter() < deadline:
+            self._poll(tasks)
+            if all(t.done for t in tasks):
+                break
+            time.sleep(POLL_INTERVAL_SECS)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+        for t in tasks:
+            labels = {**self.labels, "kind": t.kind}
+            if t.status != STATUS_COMPLETED:
+                self.record("failed_tasks", 1, "tasks", **labels)
+                continue
+            self.record("total", (t.ended_at - t.submitted_at) * 1000, "ms", **labels)
+            # Tasks proven between two polls were never seen in progress.
+            if t.started_at is not None:
+                self.record("queue_wait", (t.started_at - t.submitted_at) * 1000, "ms", **labels)
+                self.record("execution", (t.ended_at - t.started_at) * 1000, "ms", **labels)
+
+        completed = [t for t in tasks if t.status == STATUS_COMPLETED]
+        self.record("proofs_per_minute", len(completed) * 60 / elapsed, "proofs/min", **self.labels)
+
+        cpu = sampler.summary()["prover_client"].get("cpu_pct")
+        if cpu is not None:
+            self.record("cpu_peak", cpu["peak"], "%", **self.labels)
+            self.record("cpu_mean", cpu["mean"], "%", **self.labels)
+            # Share of all the cores of the host that the prover kept busy on average.
+            cores = os.cpu_count() or 1
+            self.record("cpu_saturation", cpu["mean"] / (100 * cores), "ratio", **self.labels)
+        self.info(f"{len(completed)}/{len(tasks)} proofs completed in {elapsed:.1f}s")
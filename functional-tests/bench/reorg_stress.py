@@ -0,0 +1,201 @@
+import random
+import time
+from typing import Optional
+
+import flexitest
+
+from envs import bench, net_settings, testenv
+from utils import (
+    ManualGenBlocksConfig,
+    get_broadcast_idx,
+    submit_checkpoint,
+    wait_until,
+    wait_until_with_value,
+)
+
+POLL_INTERVAL_SECS = 0.05
+CONVERGENCE_TIMEOUT_SECS = 60
+REPUBLISH_TIMEOUT_SECS = 30
+
+
+@flexitest.register
+class ReorgStressBench(bench.StrataBenchmark):
+    """
+    Forces L1 reorgs of random depth, up to beyond `l1_reorg_safe_depth`, every other one
+    orphaning the block with a checkpoint envelope. The orphaned blocks are replaced with a
+    longer chain of empty blocks, so the envelope is only mined again once republished.
+
+    Records the time from the replacement chain being mined to the sequencer following it,
+    and with an envelope the time from the reorg to the broadcaster republishing it. A reorg
+    diverges when the sequencer doesn't follow the new chain in time, or the checkpoint of the
+    orphaned envelope doesn't finalize afterwards, which is recorded and logged.
+
+    Parameters: `BENCH_REORGS`, `BENCH_MAX_REORG_DEPTH`, `BENCH_REORG_SEED`, and
+    `BENCH_REORG_SAFE_DEPTH`, which sets the rollup params of the env.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        settings = net_settings.get_fast_batch_settings()
+        settings.l1_reorg_safe_depth = int(bench.env_param("BENCH_REORG_SAFE_DEPTH", 4))
+        # Checkpoints are only published once proved by the benchmark.
+        settings.proof_timeout = None
+        self.safe_depth = settings.l1_reorg_safe_depth
+        ctx.set_env(
+            testenv.BasicEnvConfig(101, rollup_settings=settings, auto_generate_blocks=False)
+        )
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.n_reorgs = int(bench.env_param("BENCH_REORGS", 20))
+        self.max_depth = int(bench.env_param("BENCH_MAX_REORG_DEPTH", 2 * self.safe_depth + 2))
+        self.rng = random.Random(int(bench.env_param("BENCH_REORG_SEED", 0)))
+
+        self.seq = ctx.get_service("sequencer")
+        self.seqrpc = self.seq.create_rpc()
+        self.btcrpc = ctx.get_service("bitcoin").create_rpc()
+        self.prover_rpc = ctx.get_service("prover_client").create_rpc()
+        self.addr = self.seq.get_prop("address")
+        self.manual_gen = ManualGenBlocksConfig(self.btcrpc, self.safe_depth, self.addr)
+        self.next_checkpoint = 0
+
+        wait_until(
+            lambda: self.seqrpc.strata_protocolVersion() is not None,
+            error_with="Sequencer did not start on time",
+        )
+        wait_until(
+            lambda: self.prover_rpc.dev_strata_getReport() is not None,
+            error_with="Prover did not start on time",
+        )
+
+    def _l1_height(self) -> Optional[int]:
+        try:
+            return self.seqrpc.strata_l1status()["cur_height"]
+        except Exception:
+            return None
+
+    def _wait_l1_tip(self, tip: int, timeout: float) -> bool:
+        try:
+            wait_until(
+                lambda: (self._l1_height() or 0) >= tip,
+                error_with=f"L1 reader did not reach height {tip}",
+                timeout=timeout,
+                step=POLL_INTERVAL_SECS,
+            )
+            return True
+        except AssertionError:
+            return False
+
+    def _finalized_slot(self) -> Optional[int]:
+        try:
+            blkid = self.seqrpc.strata_syncStatus()["finalized_block_id"]
+            return self.seqrpc.strata_getHeaderById(blkid)["block_idx"]
+        except Exception:
+            return None
+
+    def _publish_checkpoint(self) -> tuple[int, dict, int]:
+        """
+        Proves and publishes the next checkpoint, the envelope is mined at the tip. Returns its
+        index, its info and the broadcaster index of its reveal tx.
+        """
+        idx = self.next_checkpoint
+        info = wait_until_with_value(
+            lambda: self.seqrpc.strata_getCheckpointInfo(idx),
+            predicate=lambda v: v is not None,
+            error_with=f"Could not find checkpoint info for index {idx}",
+            timeout=30,
+        )
+        submit_checkpoint(idx, self.seqrpc, self.prover_rpc, self.manual_gen)
+        self.next_checkpoint += 1
+        txid = self.seqrpc.strata_l1status()["last_published_txid"]
+        return idx, info, get_broadcast_idx(self.seqrpc, self.btcrpc, txid)
+
+    def _reorg(self, depth: int, with_envelope: bool):
+        labels = {
+            "depth": depth,
+            "envelope": with_envelope,
+            "beyond_safe_depth": depth > self.safe_depth,
+        }
+        proxy = self.btcrpc.proxy
+
+        checkpoint = None
+        if with_envelope:
+            checkpoint = self._publish_checkpoint()
+            proxy.generatetoaddress(depth - 1, self.addr)
+        else:
+            proxy.generatetoaddress(depth, self.addr)
+        tip = proxy.getblockcount()
+        fork_height = tip - depth + 1
+        self._wait_l1_tip(tip, CONVERGENCE_TIMEOUT_SECS)
+        orphaned = self.seqrpc.strata_getL1blockHash(fork_height)
+
+        republished = None
+        if with_envelope:
+            # The broadcaster logs its own index of the tx, not the checkpoint index.
+            republished = self.seq.log_tailer().expect(
+                rf"Successfully published tx idx={checkpoint[2]}\b"
+            )
+        # Wall clock, to compare with when the tailer saw the republish.
+        reorged_at = time.time()
+        proxy.invalidateblock(proxy.getblockhash(fork_height))
+
+        # Empty blocks, one more than orphaned for the new chain to be the longest.
+        new_addr = proxy.getnewaddress()
+        for _ in range(depth + 1):
+            proxy.generateblock(new_addr, [])
+        new_tip = proxy.getblockcount()
+        mined_at = time.perf_counter()
+
+        def _converged() -> bool:
+            height = self._l1_height()
+            if height is None or height < new_tip:
+                return False
+            return self.seqrpc.strata_getL1blockHash(fork_height) != orphaned
+
+        diverged = False
+        try:
+            wait_until(
+                _converged,
+                error_with="Sequencer did not follow the new chain",
+                timeout=CONVERGENCE_TIMEOUT_SECS,
+                step=POLL_INTERVAL_SECS,
+            )
+            self.record("recovery_time", (time.perf_counter() - mined_at) * 1000, "ms", **labels)
+        except AssertionError:
+            diverged = True
+            self.warning(f"sequencer did not follow a reorg of depth {depth} to {new_tip}")
+
+        if republished is not None:
+            try:
+                republished.wait(
+                    timeout=REPUBLISH_TIMEOUT_SECS, error_with="Checkpoint was not republished"
+                )
+                republish_time = (republished.matched_at - reorged_at) * 1000
+                self.record("republish_time", republish_time, "ms", **labels)
+            except AssertionError:
+                diverged = True
+                self.warning(f"checkpoint {checkpoint[0]} was not republished after the reorg")
+
+        if checkpoint is not None and not diverged:
+            idx, info, _ = checkpoint
+            # Mine the republished envelope, then enough blocks to finalize it.
+            proxy.generatetoaddress(self.safe_depth + 2, self.addr)
+            try:
+                wait_until(
+                    lambda: (self._finalized_slot() or -1) >= info["l2_range"][1],
+                    error_with=f"Checkpoint {idx} not finalized",
+                    timeout=30,
+                    step=POLL_INTERVAL_SECS,
+                )
+            except AssertionError:
+                diverged = True
+                self.warning(f"checkpoint {idx} did not finalize after the reorg")
+
+        self.record("diverged", int(diverged), "reorgs", **labels)
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        for n in range(self.n_reorgs):
+            depth = self.rng.randint(1, self.max_depth)
+            self._reorg(depth, with_envelope=n % 2 == 1)
+            self.info(f"reorg {n + 1}/{self.n_reorgs} of depth {depth} done")
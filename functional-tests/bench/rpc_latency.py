@@ -0,0 +1,34 @@
+import time
+
+import flexitest
+
+from envs import bench
+
+# Calls per iteration, for each RPC.
+CALLS = 50
+
+
+@flexitest.register
+class RpcLatencyBench(bench.StrataBenchmark):
+    """
+    Round-trip latency of cheap RPC calls to the sequencer, reth and bitcoind, a baseline for
+    the other benchmarks which all poll these endpoints.
+    """
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env("basic")
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.calls = {
+            "strata_clientStatus": ctx.get_service("sequencer").create_rpc().strata_clientStatus,
+            "eth_blockNumber": ctx.get_service("reth").create_rpc().eth_blockNumber,
+            "getblockcount": ctx.get_service("bitcoin").create_pooled_rpc().getblockcount,
+        }
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        for method, call in self.calls.items():
+            for _ in range(CALLS):
+                start = time.perf_counter()
+                call()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.record("rpc_latency", elapsed_ms, "ms", method=method)
@@ -0,0 +1,121 @@
+import os
+import signal
+import time
+from typing import Optional
+
+import flexitest
+
+from envs import bench, testenv
+from factory.resources import dir_size, service_pid
+from utils import wait_until
+
+# L2 slots the sequencer reaches before each restart, its datadir grows along.
+DEFAULT_HEIGHTS = [20, 100, 300]
+POLL_INTERVAL_SECS = 0.05
+RECOVERY_TIMEOUT_SECS = 120
+
+MODE_GRACEFUL = "graceful"
+MODE_KILL = "kill"
+
+
+@flexitest.register
+class SeqRestartBench(bench.StrataBenchmark):
+    """
+    Restarts the sequencer at increasing chain heights, once shut down by the
+    `strataadmin_stop` RPC and once killed with `SIGKILL`, and times since the restart: the RPC
+    answering again, a new L2 block being produced and the L1 reader reaching the bitcoind tip
+    of the restart. The size of the datadir at the stop is recorded along.
+
+    Parameters: `BENCH_RESTART_HEIGHTS` (comma-separated L2 slots).
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env(testenv.BasicEnvConfig(101))
+
+    def setup(self, ctx: flexitest.RunContext):
+        self.heights = sorted(bench.env_list("BENCH_RESTART_HEIGHTS", DEFAULT_HEIGHTS))
+        self.seq = ctx.get_service("sequencer")
+        self.seqrpc = self.seq.create_rpc()
+        self.btcrpc = ctx.get_service("bitcoin").create_pooled_rpc()
+
+    def _tip_slot(self) -> Optional[int]:
+        try:
+            return self.seqrpc.strata_clientStatus()["chain_tip_slot"]
+        except Exception:
+            return None
+
+    def _l1_height(self) -> Optional[int]:
+        try:
+            return self.seqrpc.strata_l1status()["cur_height"]
+        except Exception:
+            return None
+
+    def _shutdown(self, mode: str) -> float:
+        """Stops the sequencer, returns how long its process took to exit."""
+        start = time.perf_counter()
+        if mode == MODE_GRACEFUL:
+            self.seqrpc.strataadmin_stop()
+        else:
+            pid = service_pid(self.seq)
+            if pid is not None:
+                os.kill(pid, signal.SIGKILL)
+        wait_until(
+            lambda: not self.seq.check_status(),
+            error_with=f"Sequencer did not exit ({mode})",
+            timeout=60,
+            step=POLL_INTERVAL_SECS,
+        )
+        exited = time.perf_counter() - start
+        self.seq.stop()
+        return exited
+
+    def _restart(self, height: int, mode: str):
+        wait_until(
+            lambda: (self._tip_slot() or 0) >= height,
+            error_with=f"Sequencer did not reach slot {height}",
+            timeout=height * 5 + 60,
+            step=1,
+        )
+        datadir_bytes = dir_size(self.seq.datadir)
+        labels = {"height": height, "mode": mode}
+
+        exited = self._shutdown(mode)
+        l1_tip = self.btcrpc.getblockcount()
+
+        start = time.perf_counter()
+        self.seq.start()
+        seen: dict[str, float] = {}
+        # The tip once the RPC answers again, blocks produced between reading the tip and the
+        # stop would otherwise pass for new ones.
+        resumed_slot = None
+        deadline = start + RECOVERY_TIMEOUT_SECS
+        while time.perf_counter() < deadline and len(seen) < 3:
+            now = time.perf_counter() - start
+            slot = self._tip_slot()
+            if slot is not None:
+                seen.setdefault("rpc_available", now)
+                if resumed_slot is None:
+                    resumed_slot = slot
+                elif slot > resumed_slot:
+                    seen.setdefault("block_production", now)
+                l1_height = self._l1_height()
+                if l1_height is not None and l1_height >= l1_tip:
+                    seen.setdefault("l1_resync", now)
+            time.sleep(POLL_INTERVAL_SECS)
+
+        self.record("datadir_size", datadir_bytes, "bytes", **labels)
+        self.record("shutdown", exited * 1000, "ms", **labels)
+        for milestone, secs in seen.items():
+            self.record(milestone, secs * 1000, "ms", **labels)
+        for milestone in ("rpc_available", "block_production", "l1_resync"):
+            if milestone not in seen:
+                self.warning(f"no {milestone} within {RECOVERY_TIMEOUT_SECS}s ({labels})")
+        self.info(f"restart at slot {resumed_slot} ({mode}): {seen}")
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        for height in self.heights:
+            for mode in (MODE_GRACEFUL, MODE_KILL):
+                self._restart(height, mode)
@@ -0,0 +1,172 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import flexitest
+from strata_utils import extract_p2tr_pubkey, get_balance
+from web3 import Web3
+
+from envs import bench, net_settings, testenv
+from utils import get_bridge_pubkey, wait_until
+from utils.constants import PRECOMPILE_BRIDGEOUT_ADDRESS, SATS_TO_WEI
+from utils.el_load import InclusionTracker, LoadResult, bench_accounts, fund_accounts
+
+POLL_INTERVAL_SECS = 1
+# How long a withdrawal may take from its L2 receipt to the BTC arriving.
+WITHDRAWAL_TIMEOUT_SECS = 300
+
+# Stages of a withdrawal after it's sent, in the order they happen.
+STAGES = ["l2_receipt", "duty_assigned", "btc_received"]
+
+
+@dataclass
+class PendingWithdrawal:
+    user_pk: str
+    btc_address: str
+    btc_balance: int
+    sent_at: float
+    l2_receipt: Optional[float] = None
+    duty_assigned: Optional[float] = None
+    btc_received: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.btc_received is not None
+
+
+@flexitest.register
+class WithdrawalThroughputBench(bench.StrataBenchmark, testenv.BridgeTestBase):
+    """
+    Funds many EL accounts with a deposit each, then issues a wave of withdrawals through the
+    bridge-out precompile, one per account to distinct BTC addresses. Times each withdrawal from
+    sending to its L2 receipt, to the `FulfillWithdrawal` duty showing up in
+    `strata_getBridgeDuties` and to the BTC arriving, plus the withdrawals fulfilled per minute.
+
+    Parameters: `BENCH_WITHDRAWALS`, and `BENCH_N_OPERATORS` and `BENCH_MESSAGE_INTERVAL` (ms),
+    which set the env of the benchmark. Sweeping them means running the benchmark once per
+    value.
+    """
+
+    warmup = 0
+    iterations = 1
+
+    def __init__(self, ctx: flexitest.InitContext):
+        self.n_operators = int(bench.env_param("BENCH_N_OPERATORS", 2))
+        self.message_interval = int(bench.env_param("BENCH_MESSAGE_INTERVAL", 0))
+        ctx.set_env(
+            testenv.BasicEnvConfig(
+                101,
+                rollup_settings=net_settings.get_fast_batch_settings(),
+                n_operators=self.n_operators,
+                message_interval=self.message_interval,
+            )
+        )
+
+    def setup(self, ctx: flexitest.RunContext):
+        n = int(bench.env_param("BENCH_WITHDRAWALS", 10))
+        self.amount = ctx.env.rollup_cfg().deposit_amount * SATS_TO_WEI
+        self.btc_auth = (
+            self.btcrpc.base_url,
+            self.btc.get_prop("rpc_user"),
+            self.btc.get_prop("rpc_password"),
+        )
+
+        web3: Web3 = self.reth.create_web3()
+        self.accounts = bench_accounts(web3, n, seed="withdrawal")
+        # A deposit is what's withdrawn, the gas is paid with funds from the dev account.
+        fund_accounts(web3, self.accounts, Web3.to_wei(0.01, "ether"))
+        bridge_pk = get_bridge_pubkey(self.seqrpc)
+        # Sent back to back, the inputs of unconfirmed DRTs are reserved by `strata_utils`.
+        for acct in self.accounts:
+            self.send_drt(acct.address, bridge_pk)
+        wait_until(
+            lambda: all(
+                web3.eth.get_balance(acct.address) >= self.amount for acct in self.accounts
+            ),
+            error_with="Deposits to the withdrawing accounts not credited",
+            timeout=120 + 10 * n,
+        )
+        self.tracker = InclusionTracker(web3, self.reth.heads_hub())
+        self.web3 = web3
+
+    def _send_withdrawals(self, ctx: flexitest.RunContext) -> dict[str, PendingWithdrawal]:
+        """Sends all the withdrawals back to back, returns them by L2 tx hash."""
+        chain_id = self.web3.eth.chain_id
+        gas_price = self.web3.eth.gas_price * 2
+        pending = {}
+        for acct in self.accounts:
+            btc_address = ctx.env.gen_ext_btc_address()
+            user_pk = extract_p2tr_pubkey(btc_address)
+            tx = {
+                "to": PRECOMPILE_BRIDGEOUT_ADDRESS,
+                "value": self.amount,
+                "data": bytes.fromhex(user_pk),
+                "gasPrice": gas_price,
+                "nonce": self.web3.eth.get_transaction_count(acct.address, "pending"),
+                "chainId": chain_id,
+            }
+            tx["gas"] = self.web3.eth.estimate_gas({**tx, "from": acct.address})
+            raw = acct.sign_transaction(tx).raw_transaction
+            balance = get_balance(btc_address, *self.btc_auth)
+
+            txhash = Web3.keccak(raw).to_0x_hex()
+            sent_at = time.perf_counter()
+            self.tracker.submitted(txhash, sent_at)
+            self.web3.eth.send_raw_transaction(raw)
+            pending[txhash] = PendingWithdrawal(user_pk, btc_address, balance, sent_at)
+        return pending
+
+    def _poll(self, pending: dict[str, PendingWithdrawal]):
+        now = time.perf_counter()
+        for txhash, latency in self.tracker.included().items():
+            w = pending[txhash]
+            if w.l2_receipt is None:
+                w.l2_receipt = w.sent_at + latency
+
+        duties = self.seqrpc.strata_getBridgeDuties(0, 0)["duties"]
+        assigned = {
+            d["payload"]["user_pk"].removeprefix("0x")
+            for d in duties
+            if d["type"] == "FulfillWithdrawal"
+        }
+        for w in pending.values():
+            if w.duty_assigned is None and w.user_pk in assigned:
+                w.duty_assigned = now
+            if w.duty_assigned is not None and not w.done:
+                if get_balance(w.btc_address, *self.btc_auth) > w.btc_balance:
+                    w.btc_received = now
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        # Only used for the L2 inclusion times, the withdrawals are sent as a single wave.
+        self.tracker.start(LoadResult(rate=0))
+        try:
+            start = time.perf_counter()
+            pending = self._send_withdrawals(ctx)
+
+            deadline = time.perf_counter() + WITHDRAWAL_TIMEOUT_SECS
+            while time.perf_counter() < deadline:
+                self._poll(pending)
+                if all(w.done for w in pending.values()):
+                    break
+                time.sleep(POLL_INTERVAL_SECS)
+        finally:
+            self.tracker.stop()
+
+        labels = {"n_operators": self.n_operators, "message_interval": self.message_interval}
+        for w in pending.values():
+            prev = w.sent_at
+            for stage in STAGES:
+                at = getattr(w, stage)
+                if at is None:
+                    break
+                self.record(stage, (at - prev) * 1000, "ms", **labels)
+                prev = at
+            if w.done:
+                self.record("end_to_end", (w.btc_received - w.sent_at) * 1000, "ms", **labels)
+
+        fulfilled = [w for w in pending.values() if w.done]
+        self.record("unfulfilled", len(pending) - len(fulfilled), "withdrawals", **labels)
+        if fulfilled:
+            span = max(w.btc_received for w in fulfilled) - start
+            self.record("withdrawals_per_minute", len(fulfilled) * 60 / span, "wd/min", **labels)
+        self.info(f"{len(fulfilled)}/{len(pending)} withdrawals fulfilled")
@@ -5,26 +5,34 @@ import sys
 
 import flexitest
 
-from envs import net_settings, testenv
+from envs import bench, net_settings, testenv, topology
 from factory import factory
+from factory.sleeps import SLEEPS, format_sites
+from factory.trace import TRACE
 from utils import *
+from utils import logindex, timing
 from utils.constants import *
 
 
 def main(argv):
+    # With `--bench`, run the benchmarks in `bench/` instead of the tests.
+    run_bench = "--bench" in argv
+    argv = [arg for arg in argv if arg != "--bench"]
+    suite = "bench" if run_bench else "tests"
+
     root_dir = os.path.dirname(os.path.abspath(__file__))
-    test_dir = os.path.join(root_dir, "tests")
+    test_dir = os.path.join(root_dir, suite)
     modules = flexitest.runtime.scan_dir_for_modules(test_dir)
     all_tests = flexitest.runtime.load_candidate_modules(modules)
 
     if len(argv) > 1:
         # Run the specific test file passed as the first argument (without .py extension)
-        tests = [str(tst).removesuffix(".py").removeprefix("tests/") for tst in argv[1:]]
+        tests = [str(tst).removesuffix(".py").removeprefix(f"{suite}/") for tst in argv[1:]]
     else:
         # Run all tests
         tests = all_tests
 
-    btc_fac = factory.BitcoinFactory([12300 + i for i in range(100)])
+    btc_fac = factory.BitcoinFactory([13300 + i for i in range(100 * 4)])
     seq_fac = factory.StrataFactory([12400 + i for i in range(100)])
     fullnode_fac = factory.FullNodeFactory([12500 + i for i in range(100)])
     reth_fac = factory.RethFactory([12600 + i for i in range(100 * 3)])
@@ -51,21 +59,40 @@ def main(argv):
         "fast_batches": testenv.BasicEnvConfig(
             101, rollup_settings=net_settings.get_fast_batch_settings()
         ),
-        "hub1": testenv.HubNetworkEnvConfig(
-            2
-        ),  # TODO: Need to generate at least horizon blocks, based on params
+        # TODO: Need to generate at least horizon blocks, based on params
+        "hub1": topology.TopologyEnvConfig(topology.Topology.hub(1), 2),
         "prover": testenv.BasicEnvConfig(101),
     }
 
     setup_root_logger()
+    if os.getenv("TRACE_TESTS"):
+        TRACE.enable()
+    # Account for the sleeps of every test, it wraps `time.sleep` so it's opt-in.
+    profile_sleeps = bool(os.getenv("PROFILE_SLEEPS"))
+    if profile_sleeps:
+        SLEEPS.enable()
     datadir_root = flexitest.create_datadir_in_workspace(os.path.join(root_dir, DD_ROOT))
     rt = testenv.StrataTestRuntime(global_envs, datadir_root, factories)
     rt.prepare_registered_tests()
 
     results = rt.run_tests(tests)
     rt.save_json_file("results.json", results)
+    rt.save_json_file("resources.json", rt.resource_summaries)
+    phases = timing.TIMER.report()
+    rt.save_json_file("phases.json", phases)
+    print(timing.format_ranking(phases))
+    if profile_sleeps:
+        sleeps = SLEEPS.report()
+        rt.save_json_file("sleeps.json", sleeps)
+        print(format_sites(sleeps))
+    if run_bench:
+        rt.save_json_file("bench_results.json", bench.bench_report(root_dir, rt.bench_results))
     flexitest.dump_results(results)
 
+    # Index the service logs up front, `search_logs.py` otherwise indexes them on first use.
+    if os.getenv("INDEX_LOGS"):
+        logindex.index_datadir(datadir_root)
+
     flexitest.fail_on_error(results)
 
     return 0
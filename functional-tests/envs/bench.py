@@ -0,0 +1,197 @@
+"""
+Base for the benchmarks in `bench/`, run with `entry.py --bench`.
+
+Benchmarks are registered and declare their env like tests do. Each one runs some warm-up
+iterations, whose samples are dropped, then the measured iterations, recording samples with
+`StrataBenchmark.record`. The summaries of all benchmarks are gathered by the runtime and
+written to `bench_results.json` together with the git revision and the hashes of the binaries.
+"""
+
+import hashlib
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Optional, TypeVar
+
+import flexitest
+
+from envs import testenv
+
+# Binaries whose hashes identify what was benchmarked.
+BENCH_BINARIES = [
+    "strata-client",
+    "strata-reth",
+    "strata-prover-client",
+    "strata-bridge-client",
+    "bitcoind",
+]
+
+PERCENTILES = [50, 90, 95, 99]
+
+T = TypeVar("T")
+
+
+def env_param(name: str, default: float) -> float:
+    """Numeric benchmark parameter, overridable with the env var `name`."""
+    return float(os.getenv(name, default))
+
+
+def env_list(name: str, default: list[T]) -> list[T]:
+    """
+    List parameter of a benchmark, e.g. a sweep, overridable with a comma-separated env var.
+    The values are of the type of those of `default`, so labels don't change with the source.
+    """
+    v = os.getenv(name)
+    if not v:
+        return default
+    kind = type(default[0]) if default else float
+    return [kind(x) for x in v.split(",")]
+
+
+def percentile(sorted_samples: list[float], p: float) -> float:
+    """Percentile of sorted samples, with linear interpolation between closest ranks."""
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    k = (len(sorted_samples) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (k - lo)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Min, max, mean, stdev and percentiles of the samples."""
+    if not samples:
+        return {}
+    s = sorted(samples)
+    out = {
+        "count": len(s),
+        "min": s[0],
+        "max": s[-1],
+        "mean": statistics.fmean(s),
+        "stdev": statistics.stdev(s) if len(s) > 1 else 0.0,
+    }
+    for p in PERCENTILES:
+        out[f"p{p}"] = percentile(s, p)
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in out.items()}
+
+
+@dataclass
+class Metric:
+    name: str
+    unit: str
+    labels: dict[str, str | int | float] = field(default_factory=dict)
+    samples: list[float] = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {
+            "metric": self.name,
+            "unit": self.unit,
+            "labels": self.labels,
+            "samples": self.samples,
+            "summary": summarize(self.samples),
+        }
+
+
+class StrataBenchmark(testenv.StrataTester):
+    """
+    Base class for benchmarks. Subclasses implement `iteration`, and can override `setup`,
+    which runs once before the warm-up.
+
+    The number of iterations can be overridden for all benchmarks with `BENCH_WARMUP` and
+    `BENCH_ITERATIONS`.
+    """
+
+    warmup: int = 1
+    iterations: int = 5
+
+    def setup(self, ctx: flexitest.RunContext):
+        pass
+
+    def iteration(self, ctx: flexitest.RunContext, i: int):
+        raise NotImplementedError
+
+    def record(self, metric: str, value: float, unit: str, **labels):
+        """Records a sample of `metric`, ignored during the warm-up."""
+        if self._warming_up:
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        m = self._metrics.get(key)
+        if m is None:
+            m = self._metrics[key] = Metric(metric, unit, labels)
+        m.samples.append(value)
+
+    def main(self, ctx: flexitest.RunContext):
+        # Set here rather than in `__init__`, which subclasses override without calling it.
+        self._metrics: dict[tuple, Metric] = {}
+        self._warming_up = False
+        warmup = int(os.getenv("BENCH_WARMUP", self.warmup))
+        iterations = int(os.getenv("BENCH_ITERATIONS", self.iterations))
+
+        self.setup(ctx)
+
+        self._warming_up = True
+        for i in range(warmup):
+            self.info(f"warm-up iteration {i + 1}/{warmup}")
+            self.iteration(ctx, i)
+
+        self._warming_up = False
+        start = time.monotonic()
+        for i in range(iterations):
+            self.info(f"measured iteration {i + 1}/{iterations}")
+            self.iteration(ctx, i)
+        elapsed = time.monotonic() - start
+
+        result = {
+            "warmup": warmup,
+            "iterations": iterations,
+            "elapsed_secs": round(elapsed, 3),
+            "metrics": [m.to_json() for m in self._metrics.values()],
+        }
+        runtime = getattr(ctx, "runtime", None)
+        if runtime is not None:
+            runtime.bench_results[ctx.name] = result
+        for m in self._metrics.values():
+            s = summarize(m.samples)
+            self.info(f"{m.name} {m.labels}: p50 {s['p50']} {m.unit}, p99 {s['p99']} {m.unit}")
+        return True
+
+
+def git_revision(root_dir: str) -> Optional[str]:
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root_dir, text=True)
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=root_dir).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev.strip() + ("-dirty" if dirty else "")
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def binary_hashes() -> dict[str, Optional[dict[str, str]]]:
+    """Paths and hashes of the binaries used by the envs, as found on the `PATH`."""
+    out = {}
+    for name in BENCH_BINARIES:
+        path = shutil.which(name)
+        out[name] = {"path": path, "sha256": file_sha256(path)} if path is not None else None
+    return out
+
+
+def bench_report(root_dir: str, results: dict[str, dict]) -> dict:
+    """Assembles the results of all the benchmarks with what identifies the run."""
+    return {
+        "git_revision": git_revision(root_dir),
+        "binaries": binary_hashes(),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "timestamp": int(time.time()),
+        "benchmarks": results,
+    }
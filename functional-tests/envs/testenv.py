@@ -1,3 +1,5 @@
+import functools
+import os
 import time
 from math import ceil
 from typing import Optional
@@ -12,7 +14,14 @@ from strata_utils import (
 from web3 import Web3, middleware
 
 from envs.rollup_params_cfg import RollupConfig
+from factory import progress
+from factory.btcrpc import BitcoindRpc
+from factory.factory import save_chain_template
+from factory.resources import DEFAULT_SAMPLE_INTERVAL_SECS, ResourceSampler
+from factory.sleeps import SLEEPS
+from factory.trace import TRACE
 from utils import *
+from utils import timing
 from utils.constants import *
 
 # Local constants
@@ -21,6 +30,47 @@ from utils.constants import *
 ETH_PRIVATE_KEY = "0x0000000000000000000000000000000000000000000000000000000000000001"
 
 
+def should_trace(test_name: str) -> bool:
+    """
+    Whether to save the timeline of a test, per `TRACE_TESTS`: `1` for all the tests, or a
+    comma-separated list of test names.
+    """
+    tests = os.getenv("TRACE_TESTS", "")
+    return tests == "1" or test_name in tests.split(",")
+
+
+# Run context of the test that ran last, until it's finished.
+_current_ctx: Optional["StrataRunContext"] = None
+
+
+def finish_current_test():
+    """
+    Finishes the run context of the test that ran last, if not done yet. flexitest has no hook
+    for the end of a test, so this is called at the next step of the run once a test is over:
+    the init or shutdown of an env, the next run context or the end of the run.
+    """
+    global _current_ctx
+    if _current_ctx is not None:
+        _current_ctx.finish()
+        _current_ctx = None
+
+
+def _time_test_phases(test: flexitest.Test, name: str):
+    """
+    Times the `premain` and `main` of a test instance, each as its own phase. The methods of
+    the class are rebound on every run, so a test run twice isn't timed twice.
+    """
+    for kind in (timing.PREMAIN, timing.MAIN):
+        fn = getattr(type(test), kind).__get__(test)
+
+        @functools.wraps(fn)
+        def _timed(ctx: flexitest.RunContext, fn=fn, kind=kind):
+            with timing.TIMER.phase(kind, name):
+                return fn(ctx)
+
+        setattr(test, kind, _timed)
+
+
 class StrataTester(flexitest.Test):
     """
     Class to be used instead of flexitest.Test for accessing logger
@@ -40,20 +90,92 @@ class StrataTestRuntime(flexitest.TestRuntime):
     Extended testenv.StrataTestRuntime to call custom run context
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # test name -> service -> resource usage summary, see `ResourceSampler.summary`
+        self.resource_summaries: dict[str, dict] = {}
+        # benchmark name -> results, see `bench.StrataBenchmark`
+        self.bench_results: dict[str, dict] = {}
+
     def create_run_context(self, name: str, env: flexitest.LiveEnv) -> flexitest.RunContext:
-        return StrataRunContext(self.datadir_root, name, env)
+        global _current_ctx
+        finish_current_test()
+        _current_ctx = StrataRunContext(self.datadir_root, name, env, self)
+        # flexitest runs the `premain` then the `main` of the test with this context.
+        _time_test_phases(self.tests[name], name)
+        return _current_ctx
+
+    def run_tests(self, tests):
+        try:
+            return super().run_tests(tests)
+        finally:
+            finish_current_test()
 
 
 class StrataRunContext(flexitest.RunContext):
     """
     Custom run context which provides access to services and some test specific variables.
     To be used by ExtendedTestRuntime
+
+    It also samples the resource usage of the services of the env while the test runs, unless
+    `RESOURCE_SAMPLE_INTERVAL` is set to 0. The time series is saved in
+    `<datadir_root>/resources/<test_name>.json`. Likewise the chain progress of the nodes is
+    recorded in `<datadir_root>/progress/<test_name>.json.gz`, unless `PROGRESS_SAMPLE_INTERVAL`
+    is set to 0. If the test is traced (see `should_trace`), its
+    timeline is saved in `<datadir_root>/traces/<test_name>.json`.
     """
 
-    def __init__(self, datadir_root: str, name: str, env: flexitest.LiveEnv):
+    def __init__(
+        self,
+        datadir_root: str,
+        name: str,
+        env: flexitest.LiveEnv,
+        runtime: Optional[StrataTestRuntime] = None,
+    ):
         self.name = name
         self.datadir_root = datadir_root
+        self.runtime = runtime
+        self._finished = False
         super().__init__(env)
+        timing.TIMER.set_test(name)
+        SLEEPS.set_test(name)
+
+        svcs = getattr(env, "svcs", {})
+        self.sampler = None
+        interval = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", DEFAULT_SAMPLE_INTERVAL_SECS))
+        if interval > 0:
+            self.sampler = ResourceSampler(svcs, interval)
+            self.sampler.start()
+
+        self.progress = None
+        default_interval = progress.DEFAULT_SAMPLE_INTERVAL_SECS
+        interval = float(os.getenv("PROGRESS_SAMPLE_INTERVAL", default_interval))
+        if interval > 0:
+            self.progress = progress.ChainProgressRecorder(svcs, interval)
+            self.progress.start()
+
+    def finish(self):
+        """Called once the test is over, records what was measured during the test."""
+        if self._finished:
+            return
+        self._finished = True
+        timing.TIMER.set_test(None)
+        SLEEPS.set_test(None)
+
+        if should_trace(self.name):
+            TRACE.save(os.path.join(self.datadir_root, "traces", f"{self.name}.json"))
+        else:
+            TRACE.discard()
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.save(os.path.join(self.datadir_root, "resources", f"{self.name}.json"))
+            if self.runtime is not None:
+                self.runtime.resource_summaries[self.name] = self.sampler.summary()
+
+        if self.progress is not None:
+            self.progress.stop()
+            self.progress.save(os.path.join(self.datadir_root, "progress", f"{self.name}.json.gz"))
 
 
 class BridgeTestBase(StrataTester):
@@ -69,7 +191,7 @@ class BridgeTestBase(StrataTester):
         self.reth = ctx.get_service("reth")
 
         self.seqrpc = self.seq.create_rpc()
-        self.btcrpc: BitcoindClient = self.btc.create_rpc()
+        self.btcrpc: BitcoindRpc = self.btc.create_pooled_rpc()
         self.rethrpc = self.reth.create_rpc()
 
         self.web3: Web3 = self.reth.create_web3()
@@ -101,9 +223,8 @@ class BridgeTestBase(StrataTester):
 
         # Wait until the deposit is seen on L2
         expected_balance = initial_balance + deposit_amount * SATS_TO_WEI
-        wait_until(
-            lambda: int(self.rethrpc.eth_getBalance(el_address), 16) == expected_balance,
-            error_with="Strata balance after deposit is not as expected",
+        self.reth.heads_hub().wait_for_balance(
+            self.rethrpc, el_address, lambda b: b == expected_balance
         )
 
     def withdraw(
@@ -135,10 +256,7 @@ class BridgeTestBase(StrataTester):
         self.debug(f"Sent withdrawal transaction with hash: {l2_tx_hash}")
 
         # Wait for transaction receipt
-        tx_receipt = wait_until_with_value(
-            lambda: self.web3.eth.get_transaction_receipt(l2_tx_hash),
-            predicate=lambda v: v is not None,
-        )
+        tx_receipt = self.reth.heads_hub().wait_for_receipt(self.web3, l2_tx_hash)
         self.debug(f"Transaction receipt: {tx_receipt}")
 
         total_gas_used = tx_receipt["gasUsed"] * tx_receipt["effectiveGasPrice"]
@@ -190,15 +308,14 @@ class BridgeTestBase(StrataTester):
         }
         return self.web3.eth.estimate_gas(transaction)
 
-    def make_drt(self, ctx: flexitest.RunContext, el_address, musig_bridge_pk):
+    def send_drt(self, el_address, musig_bridge_pk) -> str:
         """
-        Deposit Request Transaction
+        Creates a Deposit Request Transaction and broadcasts it, returns its txid.
         """
         # Get relevant data
         btc_url = self.btcrpc.base_url
         btc_user = self.btc.get_prop("rpc_user")
         btc_password = self.btc.get_prop("rpc_password")
-        seq_addr = self.seq.get_prop("address")
 
         # Create the deposit request transaction
         tx = bytes(
@@ -208,7 +325,15 @@ class BridgeTestBase(StrataTester):
         ).hex()
 
         # Send the transaction to the Bitcoin network
-        self.btcrpc.proxy.sendrawtransaction(tx)
+        return self.btcrpc.proxy.sendrawtransaction(tx)
+
+    def make_drt(self, ctx: flexitest.RunContext, el_address, musig_bridge_pk):
+        """
+        Deposit Request Transaction
+        """
+        seq_addr = self.seq.get_prop("address")
+
+        self.send_drt(el_address, musig_bridge_pk)
         time.sleep(1)
 
         # time to mature DRT
@@ -220,6 +345,33 @@ class BridgeTestBase(StrataTester):
         time.sleep(3)
 
 
+def chain_template_dir(n_blocks: int) -> str:
+    """Where the chain template with `n_blocks` pre-generated blocks is saved."""
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root_dir, CHAIN_TEMPLATES_ROOT, f"premine-{n_blocks}")
+
+
+def _load_wallet(brpc, walletname: str):
+    # bitcoind may have loaded it on startup already.
+    if walletname not in brpc.proxy.listwallets():
+        brpc.proxy.loadwallet(walletname)
+
+
+def _timed_env_init(init):
+    """Wraps `EnvConfig.init` to time it, also naming the env for its teardown timing."""
+
+    @functools.wraps(init)
+    def _init(self, ctx: flexitest.EnvContext) -> flexitest.LiveEnv:
+        finish_current_test()
+        name = os.path.basename(ctx.envdd_path)
+        with timing.TIMER.phase(timing.ENV_INIT, name):
+            env = init(self, ctx)
+        env.name = name
+        return env
+
+    return _init
+
+
 class BasicLiveEnv(flexitest.LiveEnv):
     """
     A common thin layer for all instances of the Environments.
@@ -234,6 +386,20 @@ class BasicLiveEnv(flexitest.LiveEnv):
         self._rec_btc_addr_idx = 0
         self._bridge_pk = bridge_pk
         self._rollup_cfg = rollup_cfg
+        # Set by the env config, see `_timed_env_init`.
+        self.name = "env"
+
+    def shutdown(self):
+        finish_current_test()
+        with timing.TIMER.phase(timing.TEARDOWN, self.name):
+            # The notification hubs are kept across service restarts, they go with the env.
+            for svc in self.svcs.values():
+                if hasattr(svc, "close_hubs"):
+                    svc.close_hubs()
+                # The UTXOs reserved by `strata_utils` for the DRTs built against the env.
+                if hasattr(svc, "release_pending_spends"):
+                    svc.release_pending_spends()
+            super().shutdown()
 
     def gen_el_address(self) -> str:
         """
@@ -274,7 +440,15 @@ class BasicEnvConfig(flexitest.EnvConfig):
         message_interval: int = 0,
         duty_timeout_duration: int = 10,
         custom_chain: str = "dev",
+        prover_native_workers: int = DEFAULT_PROVER_NATIVE_WORKERS,
+        prover_loop_interval: int = DEFAULT_PROVER_LOOP_INTERVAL_MSEC,
+        use_chain_template: bool = False,
     ):
+        """
+        With `use_chain_template`, the pre-generated blocks are mined once and the chain is
+        saved in `CHAIN_TEMPLATES_ROOT` for later envs with the same number of blocks to start
+        from a copy of it.
+        """
         super().__init__()
         self.pre_generate_blocks = pre_generate_blocks
         self.rollup_settings = rollup_settings
@@ -284,7 +458,11 @@ class BasicEnvConfig(flexitest.EnvConfig):
         self.message_interval = message_interval
         self.duty_timeout_duration = duty_timeout_duration
         self.custom_chain = custom_chain
+        self.prover_native_workers = prover_native_workers
+        self.prover_loop_interval = prover_loop_interval
+        self.use_chain_template = use_chain_template
 
+    @_timed_env_init
     def init(self, ctx: flexitest.EnvContext) -> flexitest.LiveEnv:
         btc_fac = ctx.get_factory("bitcoin")
         seq_fac = ctx.get_factory("sequencer")
@@ -296,7 +474,8 @@ class BasicEnvConfig(flexitest.EnvConfig):
         # set up network params
         initdir = ctx.make_service_dir("_init")
         settings = self.rollup_settings or RollupParamsSettings.new_default()
-        params_gen_data = generate_simple_params(initdir, settings, self.n_operators)
+        with timing.TIMER.phase(timing.ENV_STEP, "gen_params"):
+            params_gen_data = generate_simple_params(initdir, settings, self.n_operators)
         params = params_gen_data["params"]
         # Instantiaze the generated rollup config so it's convenient to work with.
         rollup_cfg = RollupConfig.model_validate_json(params)
@@ -319,28 +498,38 @@ class BasicEnvConfig(flexitest.EnvConfig):
         )
         reth_port = reth.get_prop("rpc_port")
 
-        bitcoind = btc_fac.create_regtest_bitcoin()
+        if self.pre_generate_blocks > 0 and self.pre_fund_addrs:
+            # Since the pre-funding is enabled, we have to ensure the amount of pre-generated
+            # blocks is enough to deal with the coinbase maturation.
+            # Also, leave a log-message to indicate that the setup is little inconsistent.
+            if self.pre_generate_blocks < 101:
+                print("Env setup: pre_fund_addrs is enabled, specify pre_generate_blocks >= 101.")
+                self.pre_generate_blocks = 101
+
+        # Keyed by the number of blocks actually mined, so after the adjustment above.
+        template = None
+        if self.use_chain_template and self.pre_generate_blocks > 0:
+            template = chain_template_dir(self.pre_generate_blocks)
+        from_template = template is not None and os.path.isdir(template)
+
+        bitcoind = btc_fac.create_regtest_bitcoin(template=template if from_template else None)
         svcs["bitcoin"] = bitcoind
         time.sleep(BLOCK_GENERATION_INTERVAL_SECS)
 
         brpc = bitcoind.create_rpc()
         walletname = bitcoind.get_prop("walletname")
-        brpc.proxy.createwallet(walletname)
+        if from_template:
+            _load_wallet(brpc, walletname)
+        else:
+            brpc.proxy.createwallet(walletname)
         seqaddr = brpc.proxy.getnewaddress()
 
         if self.pre_generate_blocks > 0:
-            if self.pre_fund_addrs:
-                # Since the pre-funding is enabled, we have to ensure the amount of pre-generated
-                # blocks is enough to deal with the coinbase maturation.
-                # Also, leave a log-message to indicate that the setup is little inconsistent.
-                if self.pre_generate_blocks < 101:
-                    print(
-                        "Env setup: pre_fund_addrs is enabled, specify pre_generate_blocks >= 101."
-                    )
-                    self.pre_generate_blocks = 101
+            if from_template:
+                print(f"Starting from the chain template at {template}")
 
             chunk_size = 500
-            while self.pre_generate_blocks > 0:
+            while self.pre_generate_blocks > 0 and not from_template:
                 batch_size = min(self.pre_generate_blocks, 1000)
 
                 # generate blocks in chunks to avoid timeout
@@ -353,10 +542,16 @@ class BasicEnvConfig(flexitest.EnvConfig):
                     print(
                         f"Pre generating {num_blocks} blocks to address {seqaddr}; chunk = {chunk}"
                     )
-                    brpc.proxy.generatetoaddress(chunk_size, seqaddr)
+                    with timing.TIMER.phase(timing.ENV_STEP, "premine"):
+                        brpc.proxy.generatetoaddress(chunk_size, seqaddr)
 
                 self.pre_generate_blocks -= batch_size
 
+            if template is not None and not from_template:
+                with timing.TIMER.phase(timing.ENV_STEP, "save_chain_template"):
+                    save_chain_template(bitcoind, template)
+                _load_wallet(brpc, walletname)
+
             if self.pre_fund_addrs:
                 # Send funds for btc external and recovery addresses used in the test logic.
                 # Generate one more block so the transaction is on the blockchain.
@@ -391,7 +586,8 @@ class BasicEnvConfig(flexitest.EnvConfig):
         # Need to wait for at least `genesis_l1_height` blocks to be generated.
         # Sleeping some more for safety
         if self.auto_generate_blocks:
-            time.sleep(BLOCK_GENERATION_INTERVAL_SECS * 10)
+            with timing.TIMER.phase(timing.ENV_STEP, "genesis_wait"):
+                time.sleep(BLOCK_GENERATION_INTERVAL_SECS * 10)
 
         svcs["sequencer"] = sequencer
         svcs["reth"] = reth
@@ -423,138 +619,9 @@ class BasicEnvConfig(flexitest.EnvConfig):
             f"http://localhost:{seq_port}",
             f"http://localhost:{reth_rpc_http_port}",
             params,
+            native_workers=self.prover_native_workers,
+            loop_interval=self.prover_loop_interval,
         )
         svcs["prover_client"] = prover_client
 
         return BasicLiveEnv(svcs, bridge_pk, rollup_cfg)
-
-
-class HubNetworkEnvConfig(flexitest.EnvConfig):
-    def __init__(
-        self,
-        pre_generate_blocks: int = 0,
-        rollup_settings: Optional[RollupParamsSettings] = None,
-        auto_generate_blocks: bool = True,
-        n_operators: int = 2,
-        duty_timeout_duration: int = 10,
-    ):
-        self.pre_generate_blocks = pre_generate_blocks
-        self.rollup_settings = rollup_settings
-        self.auto_generate_blocks = auto_generate_blocks
-        self.n_operators = n_operators
-        self.duty_timeout_duration = duty_timeout_duration
-        super().__init__()
-
-    def init(self, ctx: flexitest.EnvContext) -> flexitest.LiveEnv:
-        btc_fac = ctx.get_factory("bitcoin")
-        seq_fac = ctx.get_factory("sequencer")
-        reth_fac = ctx.get_factory("reth")
-        fn_fac = ctx.get_factory("fullnode")
-        bridge_fac = ctx.get_factory("bridge_client")
-
-        # set up network params
-        initdir = ctx.make_service_dir("_init")
-        settings = self.rollup_settings or RollupParamsSettings.new_default()
-        params_gen_data = generate_simple_params(initdir, settings, self.n_operators)
-        params = params_gen_data["params"]
-        # Instantiaze the generated rollup config so it's convenient to work with.
-        rollup_cfg = RollupConfig.model_validate_json(params)
-
-        # Construct the bridge pubkey from the config.
-        # Technically, we could use utils::get_bridge_pubkey, but this makes sequencer
-        # a dependency of pre-funding logic and just complicates the env setup.
-        bridge_pk = get_bridge_pubkey_from_cfg(rollup_cfg)
-        # TODO also grab operator keys and launch operators
-
-        # reth needs some time to startup, start it first
-        secret_dir = ctx.make_service_dir("secret")
-        reth_secret_path = os.path.join(secret_dir, "jwt.hex")
-
-        with open(reth_secret_path, "w") as file:
-            file.write(generate_jwt_secret())
-
-        reth = reth_fac.create_exec_client(0, reth_secret_path, None)
-        seq_reth_rpc_port = reth.get_prop("eth_rpc_http_port")
-        fullnode_reth = reth_fac.create_exec_client(
-            1, reth_secret_path, f"http://localhost:{seq_reth_rpc_port}"
-        )
-        reth_authrpc_port = reth.get_prop("rpc_port")
-
-        bitcoind = btc_fac.create_regtest_bitcoin()
-        # wait for services to to startup
-        time.sleep(BLOCK_GENERATION_INTERVAL_SECS)
-
-        brpc = bitcoind.create_rpc()
-
-        walletname = "dummy"
-        brpc.proxy.createwallet(walletname)
-
-        seqaddr = brpc.proxy.getnewaddress()
-
-        if self.pre_generate_blocks > 0:
-            print(f"Pre generating {self.pre_generate_blocks} blocks to address {seqaddr}")
-            brpc.proxy.generatetoaddress(self.pre_generate_blocks, seqaddr)
-
-        # generate blocks every 500 millis
-        if self.auto_generate_blocks:
-            generate_blocks(brpc, BLOCK_GENERATION_INTERVAL_SECS, seqaddr)
-        rpc_port = bitcoind.get_prop("rpc_port")
-        rpc_user = bitcoind.get_prop("rpc_user")
-        rpc_pass = bitcoind.get_prop("rpc_password")
-        rpc_sock = f"localhost:{rpc_port}/wallet/{walletname}"
-        bitcoind_config = {
-            "bitcoind_sock": rpc_sock,
-            "bitcoind_user": rpc_user,
-            "bitcoind_pass": rpc_pass,
-        }
-        reth_config = {
-            "reth_socket": f"localhost:{reth_authrpc_port}",
-            "reth_secret_path": reth_secret_path,
-        }
-        sequencer = seq_fac.create_sequencer(bitcoind_config, reth_config, seqaddr, params)
-        # Need to wait for at least `genesis_l1_height` blocks to be generated.
-        # Sleeping some more for safety
-        if self.auto_generate_blocks:
-            time.sleep(BLOCK_GENERATION_INTERVAL_SECS * 10)
-
-        fullnode_reth_port = fullnode_reth.get_prop("rpc_port")
-        fullnode_reth_config = {
-            "reth_socket": f"localhost:{fullnode_reth_port}",
-            "reth_secret_path": reth_secret_path,
-        }
-
-        sequencer_rpc = f"ws://localhost:{sequencer.get_prop('rpc_port')}"
-
-        fullnode = fn_fac.create_fullnode(
-            bitcoind_config,
-            fullnode_reth_config,
-            sequencer_rpc,
-            params,
-        )
-
-        svcs = {
-            "bitcoin": bitcoind,
-            "seq_node": sequencer,
-            "seq_reth": reth,
-            "follower_1_node": fullnode,
-            "follower_1_reth": fullnode_reth,
-        }
-
-        # Create all the bridge clients.
-        for i in range(self.n_operators):
-            xpriv_path = params_gen_data["opseedpaths"][i]
-            xpriv = None
-            with open(xpriv_path) as f:
-                xpriv = f.read().strip()
-            seq_url = sequencer.get_prop("rpc_url")
-            br = bridge_fac.create_operator(
-                xpriv,
-                seq_url,
-                bitcoind_config,
-                message_interval=settings.message_interval,
-                duty_timeout_duration=self.duty_timeout_duration,
-            )
-            name = f"bridge.{i}"
-            svcs[name] = br
-
-        return BasicLiveEnv(svcs, bridge_pk, rollup_cfg)
@@ -0,0 +1,331 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import flexitest
+
+from envs.rollup_params_cfg import RollupConfig
+from envs.testenv import BasicLiveEnv, _timed_env_init
+from factory.btcnet import BitcoinNetwork
+from utils import *
+from utils import timing
+from utils.constants import *
+
+# Name of the sequencer in a topology, its services are `seq_node` and `seq_reth`.
+SEQUENCER = "seq"
+READY_TIMEOUT_SECS = 60
+# BTC sent from the premine to the wallet of every bitcoind other than the sequencer's.
+WALLET_FUNDING_BTC = 10
+# Premined blocks needed for a mature coinbase to fund the other wallets from.
+MIN_FUNDING_PREMINE = 101
+
+
+def follower_name(i: int) -> str:
+    """Name of the `i`-th fullnode of a topology, counted from 1."""
+    return f"follower_{i}"
+
+
+def node_service(name: str) -> str:
+    return f"{name}_node"
+
+
+def reth_service(name: str) -> str:
+    return f"{name}_reth"
+
+
+def bitcoin_service(i: int) -> str:
+    """Name of the `i`-th bitcoind of a topology, the first one is just `bitcoin`."""
+    return f"bitcoin_{i}" if i > 0 else "bitcoin"
+
+
+@dataclass
+class FullnodeSpec:
+    """
+    A fullnode with its own reth. It syncs from the node named by `follows`, the sequencer or
+    an earlier fullnode, and its reth forwards transactions to the reth of the sequencer.
+    """
+
+    follows: str = SEQUENCER
+
+
+@dataclass
+class L1Spec:
+    """
+    The regtest bitcoinds of a network, all peered with each other, and the index of the one
+    used by the sequencer (and the prover client), by the fullnodes, by the bridge operators
+    and by the block generator.
+
+    Every bitcoind has its own wallet. The premine goes to the wallet of the sequencer's, which
+    then funds the others with `WALLET_FUNDING_BTC` each.
+    """
+
+    n_nodes: int = 1
+    sequencer: int = 0
+    fullnodes: int = 0
+    operators: int = 0
+    miner: int = 0
+
+    def __post_init__(self):
+        for role in ("sequencer", "fullnodes", "operators", "miner"):
+            if not 0 <= getattr(self, role) < self.n_nodes:
+                raise ValueError(f"{role} attached to unknown bitcoind {getattr(self, role)}")
+
+
+@dataclass
+class Topology:
+    """
+    Declares the nodes of a network: the fullnodes, named `follower_1`, `follower_2`, ... in
+    order, the number of bridge operators, whether to run a prover client, and the bitcoinds.
+    """
+
+    fullnodes: list[FullnodeSpec] = field(default_factory=lambda: [FullnodeSpec()])
+    n_operators: int = 2
+    prover: bool = False
+    l1: L1Spec = field(default_factory=L1Spec)
+
+    def __post_init__(self):
+        known = {SEQUENCER}
+        for i, spec in enumerate(self.fullnodes, start=1):
+            if spec.follows not in known:
+                raise ValueError(f"{follower_name(i)} follows unknown node {spec.follows}")
+            known.add(follower_name(i))
+
+    @classmethod
+    def hub(cls, n_fullnodes: int, **kwargs) -> "Topology":
+        """All the fullnodes sync from the sequencer."""
+        return cls([FullnodeSpec() for _ in range(n_fullnodes)], **kwargs)
+
+    @classmethod
+    def chain(cls, n_fullnodes: int, **kwargs) -> "Topology":
+        """Every fullnode syncs from the previous one, the first from the sequencer."""
+        specs = [FullnodeSpec(follower_name(i) if i > 0 else SEQUENCER) for i in range(n_fullnodes)]
+        return cls(specs, **kwargs)
+
+    def depths(self) -> dict[str, int]:
+        """Hops from the sequencer of every fullnode, fullnodes of a depth boot together."""
+        depths = {SEQUENCER: 0}
+        for i, spec in enumerate(self.fullnodes, start=1):
+            depths[follower_name(i)] = depths[spec.follows] + 1
+        del depths[SEQUENCER]
+        return depths
+
+
+class TopologyLiveEnv(BasicLiveEnv):
+    def __init__(
+        self,
+        srvs,
+        bridge_pk,
+        rollup_cfg: RollupConfig,
+        topology: Topology,
+        l1: BitcoinNetwork,
+    ):
+        super().__init__(srvs, bridge_pk, rollup_cfg)
+        self.topology = topology
+        # Partition and heal the bitcoinds through it.
+        self.l1 = l1
+
+    def fullnode_names(self) -> list[str]:
+        return [follower_name(i) for i in range(1, len(self.topology.fullnodes) + 1)]
+
+
+def _fund_wallets(l1: BitcoinNetwork, sequencer: int, seqaddr: str):
+    """
+    Sends `WALLET_FUNDING_BTC` from the wallet of the sequencer's bitcoind to the wallet of
+    every other bitcoind, and mines it on the sequencer's bitcoind.
+    """
+    funder = l1.rpc(sequencer)
+    others = [i for i in range(len(l1.nodes)) if i != sequencer]
+    funder.sendmany("", {l1.rpc(i).getnewaddress(): WALLET_FUNDING_BTC for i in others})
+    funder.generatetoaddress(1, seqaddr)
+    l1.wait_synced()
+
+
+def _wait_ready(svcs: dict[str, flexitest.Service]):
+    """Waits in parallel for the RPC of every given strata node or reth to answer."""
+
+    def _ready(name: str, svc: flexitest.Service) -> bool:
+        try:
+            rpc = svc.create_rpc()
+            if name.endswith("_reth"):
+                return rpc.eth_blockNumber() is not None
+            return rpc.strata_protocolVersion() is not None
+        except Exception:
+            return False
+
+    def _wait(name: str, svc: flexitest.Service):
+        wait_until(
+            lambda: _ready(name, svc),
+            error_with=f"{name} did not start on time",
+            timeout=READY_TIMEOUT_SECS,
+            step=BLOCK_GENERATION_INTERVAL_SECS,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(len(svcs), 1)) as pool:
+        futures = [pool.submit(_wait, name, svc) for name, svc in svcs.items()]
+        for fut in futures:
+            fut.result()
+
+
+class TopologyEnvConfig(flexitest.EnvConfig):
+    """
+    Env with a sequencer and the fullnodes, operators, prover client and bitcoinds of a
+    `Topology`. The services are named `seq_node` and `seq_reth`, `follower_{i}_node` and
+    `follower_{i}_reth`, `bridge.{i}`, `prover_client`, and `bitcoin`, `bitcoin_1`, ...
+
+    All the reths start together, then the sequencer, then the fullnodes one depth of the
+    topology at a time, waiting in parallel for the RPCs of each depth to answer.
+    """
+
+    def __init__(
+        self,
+        topology: Topology,
+        pre_generate_blocks: int = 0,
+        rollup_settings: Optional[RollupParamsSettings] = None,
+        auto_generate_blocks: bool = True,
+        duty_timeout_duration: int = 10,
+    ):
+        if topology.l1.n_nodes > 1 and pre_generate_blocks < MIN_FUNDING_PREMINE:
+            raise ValueError(
+                f"funding the wallets of {topology.l1.n_nodes} bitcoinds needs at least "
+                f"{MIN_FUNDING_PREMINE} premined blocks, got {pre_generate_blocks}"
+            )
+        self.topology = topology
+        self.pre_generate_blocks = pre_generate_blocks
+        self.rollup_settings = rollup_settings
+        self.auto_generate_blocks = auto_generate_blocks
+        self.duty_timeout_duration = duty_timeout_duration
+        super().__init__()
+
+    @_timed_env_init
+    def init(self, ctx: flexitest.EnvContext) -> flexitest.LiveEnv:
+        btc_fac = ctx.get_factory("bitcoin")
+        seq_fac = ctx.get_factory("sequencer")
+        reth_fac = ctx.get_factory("reth")
+        fn_fac = ctx.get_factory("fullnode")
+        bridge_fac = ctx.get_factory("bridge_client")
+        topology = self.topology
+
+        # set up network params
+        initdir = ctx.make_service_dir("_init")
+        settings = self.rollup_settings or RollupParamsSettings.new_default()
+        with timing.TIMER.phase(timing.ENV_STEP, "gen_params"):
+            params_gen_data = generate_simple_params(initdir, settings, topology.n_operators)
+        params = params_gen_data["params"]
+        rollup_cfg = RollupConfig.model_validate_json(params)
+        bridge_pk = get_bridge_pubkey_from_cfg(rollup_cfg)
+
+        secret_dir = ctx.make_service_dir("secret")
+        reth_secret_path = os.path.join(secret_dir, "jwt.hex")
+        with open(reth_secret_path, "w") as f:
+            f.write(generate_jwt_secret())
+
+        # reth needs some time to startup, start all of them first
+        svcs = {}
+        reth = reth_fac.create_exec_client(0, reth_secret_path, None)
+        svcs[reth_service(SEQUENCER)] = reth
+        seq_reth_http = f"http://localhost:{reth.get_prop('eth_rpc_http_port')}"
+        for i in range(1, len(topology.fullnodes) + 1):
+            fn_reth = reth_fac.create_exec_client(i, reth_secret_path, seq_reth_http)
+            svcs[reth_service(follower_name(i))] = fn_reth
+
+        l1_spec = topology.l1
+        bitcoinds = [
+            btc_fac.create_regtest_bitcoin(name=bitcoin_service(i)) for i in range(l1_spec.n_nodes)
+        ]
+        for i, bitcoind in enumerate(bitcoinds):
+            svcs[bitcoin_service(i)] = bitcoind
+        time.sleep(BLOCK_GENERATION_INTERVAL_SECS)
+
+        # Every bitcoind gets the wallet, for the services using it.
+        walletname = bitcoinds[0].get_prop("walletname")
+        for bitcoind in bitcoinds:
+            bitcoind.create_rpc().proxy.createwallet(walletname)
+        l1 = BitcoinNetwork(bitcoinds)
+        with timing.TIMER.phase(timing.ENV_STEP, "peer_bitcoinds"):
+            l1.connect_all()
+
+        seqaddr = bitcoinds[l1_spec.sequencer].create_rpc().proxy.getnewaddress()
+        brpc = bitcoinds[l1_spec.miner].create_rpc()
+
+        if self.pre_generate_blocks > 0:
+            print(f"Pre generating {self.pre_generate_blocks} blocks to address {seqaddr}")
+            with timing.TIMER.phase(timing.ENV_STEP, "premine"):
+                brpc.proxy.generatetoaddress(self.pre_generate_blocks, seqaddr)
+                l1.wait_synced()
+        if l1_spec.n_nodes > 1:
+            with timing.TIMER.phase(timing.ENV_STEP, "fund_wallets"):
+                _fund_wallets(l1, l1_spec.sequencer, seqaddr)
+
+        # generate blocks every 500 millis
+        if self.auto_generate_blocks:
+            generate_blocks(brpc, BLOCK_GENERATION_INTERVAL_SECS, seqaddr)
+
+        def _bitcoind_config(i: int) -> dict:
+            bitcoind = bitcoinds[i]
+            return {
+                "bitcoind_sock": f"localhost:{bitcoind.get_prop('rpc_port')}/wallet/{walletname}",
+                "bitcoind_user": bitcoind.get_prop("rpc_user"),
+                "bitcoind_pass": bitcoind.get_prop("rpc_password"),
+            }
+
+        def _reth_config(name: str) -> dict:
+            port = svcs[reth_service(name)].get_prop("rpc_port")
+            return {"reth_socket": f"localhost:{port}", "reth_secret_path": reth_secret_path}
+
+        with timing.TIMER.phase(timing.ENV_STEP, "boot_sequencer"):
+            _wait_ready({n: s for n, s in svcs.items() if n.endswith("_reth")})
+            sequencer = seq_fac.create_sequencer(
+                _bitcoind_config(l1_spec.sequencer), _reth_config(SEQUENCER), seqaddr, params
+            )
+            svcs[node_service(SEQUENCER)] = sequencer
+            _wait_ready({node_service(SEQUENCER): sequencer})
+
+        # Need to wait for at least `genesis_l1_height` blocks to be generated.
+        # Sleeping some more for safety
+        if self.auto_generate_blocks:
+            with timing.TIMER.phase(timing.ENV_STEP, "genesis_wait"):
+                time.sleep(BLOCK_GENERATION_INTERVAL_SECS * 10)
+
+        depths = topology.depths()
+        with timing.TIMER.phase(timing.ENV_STEP, "boot_fullnodes"):
+            for depth in sorted(set(depths.values())):
+                booted = {}
+                for i, spec in enumerate(topology.fullnodes, start=1):
+                    name = follower_name(i)
+                    if depths[name] != depth:
+                        continue
+                    upstream = svcs[node_service(spec.follows)]
+                    booted[node_service(name)] = fn_fac.create_fullnode(
+                        _bitcoind_config(l1_spec.fullnodes),
+                        _reth_config(name),
+                        f"ws://localhost:{upstream.get_prop('rpc_port')}",
+                        params,
+                    )
+                svcs.update(booted)
+                _wait_ready(booted)
+
+        # Create all the bridge clients.
+        seq_url = sequencer.get_prop("rpc_url")
+        for i in range(topology.n_operators):
+            with open(params_gen_data["opseedpaths"][i]) as f:
+                xpriv = f.read().strip()
+            svcs[f"bridge.{i}"] = bridge_fac.create_operator(
+                xpriv,
+                seq_url,
+                _bitcoind_config(l1_spec.operators),
+                message_interval=settings.message_interval,
+                duty_timeout_duration=self.duty_timeout_duration,
+            )
+
+        if topology.prover:
+            prover_client_fac = ctx.get_factory("prover_client")
+            svcs["prover_client"] = prover_client_fac.create_prover_client(
+                _bitcoind_config(l1_spec.sequencer),
+                f"http://localhost:{sequencer.get_prop('rpc_port')}",
+                seq_reth_http,
+                params,
+            )
+
+        return TopologyLiveEnv(svcs, bridge_pk, rollup_cfg, topology, l1)
@@ -0,0 +1,101 @@
+import itertools
+from contextlib import suppress
+
+import flexitest
+
+from factory.btcrpc import BitcoindRpc
+from factory.seqrpc import RpcError
+from utils import wait_until
+
+PEER_TIMEOUT_SECS = 10
+
+
+class BitcoinNetwork:
+    """
+    P2P links between the regtest bitcoinds of an env, set up and torn down through RPC so the
+    nodes can be split into partitions that each mine their own fork, then healed.
+
+    Nodes are referred to by their index in `nodes`.
+    """
+
+    def __init__(self, nodes: list[flexitest.Service]):
+        self.nodes = nodes
+        # Links the network is meant to have, restored by `heal`.
+        self.links: set[tuple[int, int]] = set()
+
+    def rpc(self, i: int) -> BitcoindRpc:
+        return self.nodes[i].create_pooled_rpc()
+
+    def _p2p_addr(self, i: int) -> str:
+        return f"127.0.0.1:{self.nodes[i].get_prop('p2p_port')}"
+
+    def _outbound_peers(self, a: int, b: int) -> list[int]:
+        """Ids of the peers of `a` that are connections it made to `b`."""
+        addr = self._p2p_addr(b)
+        return [p["id"] for p in self.rpc(a).getpeerinfo() if p["addr"] == addr]
+
+    def _linked(self, a: int, b: int) -> bool:
+        return bool(self._outbound_peers(a, b))
+
+    def connect(self, a: int, b: int):
+        """Has `a` connect to `b`, and reconnect whenever the connection drops."""
+        self.rpc(a).addnode(self._p2p_addr(b), "add")
+        self.links.add((a, b))
+        wait_until(
+            lambda: self._linked(a, b),
+            error_with=f"bitcoind {a} did not connect to {b}",
+            timeout=PEER_TIMEOUT_SECS,
+            step=0.1,
+        )
+
+    def _unlink(self, a: int, b: int):
+        rpc = self.rpc(a)
+        # Fails when `b` isn't an added node of `a`.
+        with suppress(RpcError):
+            rpc.addnode(self._p2p_addr(b), "remove")
+        for peer_id in self._outbound_peers(a, b):
+            rpc.disconnectnode("", peer_id)
+
+    def disconnect(self, a: int, b: int):
+        """Drops the connections between `a` and `b`, whichever side made them."""
+        self._unlink(a, b)
+        self._unlink(b, a)
+        wait_until(
+            lambda: not self._linked(a, b) and not self._linked(b, a),
+            error_with=f"bitcoind {a} and {b} are still connected",
+            timeout=PEER_TIMEOUT_SECS,
+            step=0.1,
+        )
+
+    def connect_all(self):
+        """Links every pair of nodes."""
+        for a, b in itertools.combinations(range(len(self.nodes)), 2):
+            self.connect(a, b)
+
+    def partition(self, groups: list[list[int]]):
+        """
+        Drops every link between nodes of different groups, the links within a group stay.
+        Nodes in no group are left as they are.
+        """
+        group_of = {i: g for g, nodes in enumerate(groups) for i in nodes}
+        for a, b in sorted(self.links):
+            if a in group_of and b in group_of and group_of[a] != group_of[b]:
+                self.disconnect(a, b)
+
+    def heal(self):
+        """Restores all the links dropped by `partition` or `disconnect`."""
+        for a, b in sorted(self.links):
+            if not self._linked(a, b):
+                self.connect(a, b)
+
+    def tips(self) -> list[str]:
+        return [self.rpc(i).getbestblockhash() for i in range(len(self.nodes))]
+
+    def wait_synced(self, timeout: float = 30):
+        """Waits for all the nodes to agree on the best block."""
+        wait_until(
+            lambda: len(set(self.tips())) == 1,
+            error_with="bitcoinds did not converge on the same tip",
+            timeout=timeout,
+            step=0.1,
+        )
@@ -0,0 +1,70 @@
+import time
+from typing import Callable
+
+import zmq
+
+from factory.events import EventHub
+
+# Topics published by bitcoind, see `-zmqpub<topic>`.
+TOPIC_HASHBLOCK = "hashblock"
+TOPIC_RAWTX = "rawtx"
+
+# Socket receive timeout, bounds how long it takes to notice the service went down.
+RECV_TIMEOUT_MSEC = 200
+# Delay between checks of whether a stopped service is back.
+RECONNECT_DELAY_SECS = 0.5
+
+
+class ZmqHub(EventHub):
+    """
+    Subscription hub for the ZMQ notifications of a bitcoind instance.
+
+    A background thread receives the `hashblock` and `rawtx` events and wakes up any thread
+    waiting on them, so waits on L1 state are re-evaluated as soon as something happens.
+    Event bodies are the raw ZMQ payloads. The subscription is re-established if bitcoind is
+    restarted.
+    """
+
+    def __init__(self, endpoints: dict[str, str], is_alive: Callable[[], bool]):
+        super().__init__(list(endpoints))
+        self.endpoints = endpoints
+        self._is_alive = is_alive
+        self._thr.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Keep the hub around while the service is stopped, it may be restarted.
+            if not self._is_alive():
+                time.sleep(RECONNECT_DELAY_SECS)
+                continue
+            self._run_subscription()
+
+    def _run_subscription(self):
+        sock = zmq.Context.instance().socket(zmq.SUB)
+        sock.setsockopt(zmq.RCVTIMEO, RECV_TIMEOUT_MSEC)
+        sock.setsockopt(zmq.LINGER, 0)
+        for topic, endpoint in self.endpoints.items():
+            sock.connect(endpoint)
+            sock.setsockopt(zmq.SUBSCRIBE, topic.encode())
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    topic, body, *_ = sock.recv_multipart()
+                except zmq.Again:
+                    if not self._is_alive():
+                        return
+                    continue
+                self._dispatch(topic.decode(), body)
+        finally:
+            sock.close()
+
+    def wait_for_height(self, rpc, height: int, timeout: int = 5) -> str:
+        """Waits until bitcoind has a block at `height` and returns its hash."""
+        self.wait_until(
+            lambda: rpc.proxy.getblockcount() >= height,
+            error_with=f"Block at height {height} not found",
+            timeout=timeout,
+            topics=[TOPIC_HASHBLOCK],
+        )
+        return rpc.proxy.getblockhash(height)
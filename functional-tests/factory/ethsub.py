@@ -0,0 +1,95 @@
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.client import connect as wsconnect
+
+from factory.events import EventHub
+
+TOPIC_NEW_HEADS = "newHeads"
+
+# Receive timeout, bounds how long it takes to notice the service went down.
+RECV_TIMEOUT_SECS = 0.2
+# Delay between attempts to (re)connect to the websocket endpoint.
+RECONNECT_DELAY_SECS = 0.5
+
+
+class NewHeadsHub(EventHub):
+    """
+    Notifier driven by an `eth_subscribe("newHeads")` subscription on a reth websocket endpoint.
+
+    Every new head wakes up the waits on this hub, so receipt, balance and block number checks
+    are re-evaluated once per block instead of on a fixed timer. Event bodies are the decoded
+    block headers. The subscription is re-established if reth is restarted.
+    """
+
+    def __init__(self, ws_url: str, is_alive: Callable[[], bool]):
+        super().__init__([TOPIC_NEW_HEADS])
+        self.ws_url = ws_url
+        self._is_alive = is_alive
+        self._thr.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Keep the hub around while the service is stopped, it may be restarted.
+            if not self._is_alive():
+                time.sleep(RECONNECT_DELAY_SECS)
+                continue
+            try:
+                self._run_subscription()
+            except (OSError, ConnectionClosed) as ex:
+                logging.debug(f"{ex} on newHeads subscription to {self.ws_url}")
+            time.sleep(RECONNECT_DELAY_SECS)
+
+    def _run_subscription(self):
+        with wsconnect(self.ws_url) as ws:
+            req = {"jsonrpc": "2.0", "id": 0, "method": "eth_subscribe", "params": ["newHeads"]}
+            ws.send(json.dumps(req))
+            sub_id = json.loads(ws.recv())["result"]
+
+            while not self._stop.is_set():
+                try:
+                    msg = json.loads(ws.recv(timeout=RECV_TIMEOUT_SECS))
+                except TimeoutError:
+                    if not self._is_alive():
+                        return
+                    continue
+                params = msg.get("params", {})
+                if params.get("subscription") == sub_id:
+                    self._dispatch(TOPIC_NEW_HEADS, params["result"])
+
+    def head_number(self) -> Optional[int]:
+        """Number of the last head seen, if any."""
+        head = self.last_event(TOPIC_NEW_HEADS)
+        return int(head["number"], 16) if head is not None else None
+
+    def wait_for_block_number(self, number: int, timeout: int = 5) -> int:
+        """Waits until reth announces a head at or above `number` and returns the head number."""
+        return self.wait_until_with_value(
+            self.head_number,
+            predicate=lambda n: n is not None and n >= number,
+            error_with=f"Block {number} was not produced",
+            timeout=timeout,
+        )
+
+    def wait_for_receipt(self, web3, txid, timeout: int = 5):
+        """Waits until `txid` has a receipt, checking once per new head."""
+        return self.wait_until_with_value(
+            lambda: web3.eth.get_transaction_receipt(txid),
+            predicate=lambda r: r is not None,
+            error_with=f"Transaction receipt for {txid} not available",
+            timeout=timeout,
+        )
+
+    def wait_for_balance(
+        self, rethrpc, address: str, predicate: Callable[[int], bool], timeout: int = 5
+    ) -> int:
+        """Waits until the balance of `address` satisfies `predicate`, checking once per head."""
+        return self.wait_until_with_value(
+            lambda: int(rethrpc.eth_getBalance(address), 16),
+            predicate=predicate,
+            error_with=f"Balance of {address} is not as expected",
+            timeout=timeout,
+        )
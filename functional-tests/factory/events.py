@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from factory.trace import CAT_WAIT, TRACE
+
+
+class EventHub(ABC):
+    """
+    Base for the notification hubs attached to services.
+
+    Subclasses run a background thread that feeds events in with `_dispatch`. Waits on the hub
+    are re-evaluated as soon as a matching event arrives instead of on a fixed timer, and
+    callbacks can be registered per topic.
+    """
+
+    def __init__(self, topics: list[str]):
+        self.topics = topics
+        self._cond = threading.Condition()
+        self._seqs = {t: 0 for t in topics}
+        self._last = {}
+        self._callbacks: dict[str, list[Callable[[Any], Any]]] = {t: [] for t in topics}
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+
+    @abstractmethod
+    def _run(self):
+        """Receives the events until `close` is called, feeding them to `_dispatch`."""
+
+    def _dispatch(self, topic: str, body: Any):
+        with self._cond:
+            self._seqs[topic] = self._seqs.get(topic, 0) + 1
+            self._last[topic] = body
+            callbacks = list(self._callbacks.get(topic, []))
+            self._cond.notify_all()
+
+        for cb in callbacks:
+            try:
+                cb(body)
+            except Exception as ex:
+                logging.warning(f"{ex} in callback for topic {topic}")
+
+    def subscribe(self, topic: str, cb: Callable[[Any], Any]):
+        """Registers a callback invoked with the body of every event on `topic`."""
+        with self._cond:
+            self._callbacks.setdefault(topic, []).append(cb)
+
+    def unsubscribe(self, topic: str, cb: Callable[[Any], Any]):
+        """Removes a callback registered with `subscribe`."""
+        with self._cond:
+            callbacks = self._callbacks.get(topic, [])
+            if cb in callbacks:
+                callbacks.remove(cb)
+
+    def event_count(self, topic: str) -> int:
+        """Number of events received so far on `topic`."""
+        with self._cond:
+            return self._seqs.get(topic, 0)
+
+    def last_event(self, topic: str) -> Optional[Any]:
+        """Body of the last event received on `topic`, if any."""
+        with self._cond:
+            return self._last.get(topic)
+
+    def wait_until(
+        self,
+        fn: Callable[[], Any],
+        error_with: str = "Timed out",
+        timeout: int = 5,
+        topics: Optional[list[str]] = None,
+        fallback_step: float = 1.0,
+    ):
+        """
+        Like `utils.wait_until`, but `fn` is re-evaluated whenever an event is received on one
+        of `topics` (all of them by default) instead of at a fixed interval. It is also
+        re-evaluated every `fallback_step` seconds, in case an event was missed.
+        """
+        return self.wait_until_with_value(
+            fn, lambda v: bool(v), error_with, timeout, topics, fallback_step
+        )
+
+    def wait_until_with_value(
+        self,
+        fn: Callable[[], Any],
+        predicate: Callable[[Any], bool],
+        error_with: str = "Timed out",
+        timeout: int = 5,
+        topics: Optional[list[str]] = None,
+        fallback_step: float = 1.0,
+    ):
+        """
+        Event-driven version of `utils.wait_until_with_value`, see `wait_until`.
+        """
+        topics = topics or self.topics
+        deadline = time.monotonic() + timeout
+
+        def _seq() -> int:
+            return sum(self._seqs.get(t, 0) for t in topics)
+
+        def _changed(seen: int) -> Callable[[], bool]:
+            return lambda: _seq() != seen
+
+        with TRACE.span("hub_wait", CAT_WAIT, {"error_with": error_with}) as trace_args:
+            polls = 0
+            while True:
+                polls += 1
+                trace_args["polls"] = polls
+                # Snapshot the counters before evaluating, so that events arriving while `fn`
+                # runs are not lost.
+                with self._cond:
+                    seen = _seq()
+                try:
+                    r = fn()
+                    if predicate(r):
+                        return r
+                except Exception as _:
+                    pass
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AssertionError(error_with)
+                with self._cond:
+                    self._cond.wait_for(_changed(seen), timeout=min(fallback_step, remaining))
+
+    def close(self):
+        """Stops the receiving thread."""
+        self._stop.set()
+        self._thr.join()
@@ -0,0 +1,187 @@
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import threading
+import time
+from typing import Optional
+
+from utils.logindex import line_timestamp
+
+# From `<sys/inotify.h>`.
+IN_MODIFY = 0x00000002
+IN_CREATE = 0x00000100
+
+# Upper bound on how long the tailer sleeps without checking the file, used both as the
+# inotify wait timeout and as the poll interval where inotify is not available.
+POLL_INTERVAL_SECS = 0.2
+READ_CHUNK_SIZE = 1 << 16
+
+
+class _Inotify:
+    """
+    Minimal inotify wrapper, watching the directory of a file so that it works even before
+    the file is created.
+    """
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        dirpath = os.path.dirname(os.path.abspath(path)).encode()
+        if libc.inotify_add_watch(self.fd, dirpath, IN_MODIFY | IN_CREATE) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout: float):
+        """Blocks until something changed in the directory or the timeout expired."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+
+def _new_file_watcher(path: str) -> Optional[_Inotify]:
+    try:
+        return _Inotify(path)
+    except (OSError, AttributeError):
+        # Not on Linux, we fall back to polling.
+        return None
+
+
+class LogExpectation:
+    """
+    Pending wait for a line matching a regex, created with `LogTailer.expect`.
+    """
+
+    def __init__(self, pattern: re.Pattern):
+        self.pattern = pattern
+        self.match: Optional[re.Match] = None
+        # When the line was seen by the tailer, as `time.time()`.
+        self.matched_at: Optional[float] = None
+        # When the line was logged, from its timestamp, None if it has none.
+        self.logged_at: Optional[float] = None
+        self._event = threading.Event()
+
+    def _check(self, line: str) -> bool:
+        m = self.pattern.search(line)
+        if m is None:
+            return False
+        self.match = m
+        self.matched_at = time.time()
+        self.logged_at = line_timestamp(line.encode())
+        self._event.set()
+        return True
+
+    def wait(self, timeout: float = 5, error_with: Optional[str] = None) -> re.Match:
+        """Waits for the first matching line and returns its match."""
+        if not self._event.wait(timeout):
+            raise AssertionError(error_with or f"No log line matched '{self.pattern.pattern}'")
+        return self.match
+
+
+class LogTailer:
+    """
+    Follows a service log and wakes up waits on lines matching a regex.
+
+    Only lines written after the tailer was started are followed, unless `from_start` is
+    passed to `expect`. New lines are picked up through inotify where available.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: list[LogExpectation] = []
+        self._offset = os.path.getsize(path) if os.path.exists(path) else 0
+        self._partial = b""
+        self._watcher = _new_file_watcher(path)
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+        self._thr.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._read_new_lines()
+            if self._watcher is not None:
+                self._watcher.wait(POLL_INTERVAL_SECS)
+            else:
+                time.sleep(POLL_INTERVAL_SECS)
+
+    def _read_new_lines(self):
+        with self._lock:
+            self._drain()
+
+    def _drain(self):
+        """Reads the log up to its end, checking the lines against the pending expectations."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            # The file was recreated, e.g. on service restart.
+            if os.fstat(f.fileno()).st_size < self._offset:
+                self._offset = 0
+                self._partial = b""
+            # Nobody is waiting, skip ahead rather than scanning (possibly huge) trace logs.
+            if not self._pending:
+                self._offset = f.seek(0, os.SEEK_END)
+                self._partial = b""
+                return
+            f.seek(self._offset)
+            while chunk := f.read(READ_CHUNK_SIZE):
+                self._offset += len(chunk)
+                *lines, self._partial = (self._partial + chunk).split(b"\n")
+                self._check_lines(lines)
+
+    def _check_lines(self, lines: list[bytes]):
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace")
+            self._pending = [e for e in self._pending if not e._check(line)]
+            if not self._pending:
+                return
+
+    def expect(self, pattern: str | re.Pattern, from_start: bool = False) -> LogExpectation:
+        """
+        Registers a wait for a line matching `pattern`, to be waited on with
+        `LogExpectation.wait`. Registering before triggering the action guarantees the line is
+        not missed. If `from_start` is set, lines already in the log are matched too.
+        """
+        exp = LogExpectation(re.compile(pattern))
+        with self._lock:
+            # Lines already written but not read yet were logged before the expectation.
+            self._drain()
+            if from_start and self._scan_existing(exp):
+                return exp
+            self._pending.append(exp)
+        return exp
+
+    def _scan_existing(self, exp: LogExpectation) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            read = 0
+            for raw in f:
+                read += len(raw)
+                if read > self._offset:
+                    break
+                if exp._check(raw.decode("utf-8", errors="replace")):
+                    return True
+        return False
+
+    def wait_for(
+        self,
+        pattern: str | re.Pattern,
+        timeout: float = 5,
+        error_with: Optional[str] = None,
+        from_start: bool = False,
+    ) -> re.Match:
+        """Waits for a line matching `pattern` and returns its match."""
+        return self.expect(pattern, from_start=from_start).wait(timeout, error_with)
+
+    def close(self):
+        """Stops following the log."""
+        self._stop.set()
+        self._thr.join()
@@ -0,0 +1,195 @@
+"""
+Chain progress recorder, sampling the status of the nodes of an env while a test runs.
+
+Samples are stored column-wise, one column per `<service>.<field>`, so that L2 block rate,
+L1 ingestion lag or finalization lag can be computed for any run after the fact. See
+`load_progress` and the helpers at the bottom.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import flexitest
+
+DEFAULT_SAMPLE_INTERVAL_SECS = 1.0
+
+# Service kinds, set by the factories as `svc.kind` since names vary with the env, e.g.
+# `fullnode.1` or `bitcoin_1`.
+KIND_SEQUENCER = "sequencer"
+KIND_FULLNODE = "fullnode"
+KIND_RETH = "reth"
+KIND_BITCOIN = "bitcoin"
+
+
+def _service_kind(svc: flexitest.Service) -> Optional[str]:
+    return getattr(svc, "kind", None)
+
+
+def _strata_sampler(svc: flexitest.Service) -> Callable[[], dict]:
+    rpc = svc.create_rpc()
+    # blkid -> slot, finalized blocks are only reported by id.
+    slots: dict[str, int] = {}
+
+    def _slot_of(blkid: str) -> Optional[int]:
+        if blkid not in slots:
+            header = rpc.strata_getHeaderById(blkid)
+            if header is None:
+                return None
+            slots[blkid] = header["block_idx"]
+        return slots[blkid]
+
+    def _sample() -> dict:
+        out = {}
+        cs = rpc.strata_clientStatus()
+        out["chain_tip_slot"] = cs["chain_tip_slot"]
+        out["finalized_blkid"] = cs["finalized_blkid"]
+        out["buried_l1_height"] = cs["buried_l1_height"]
+
+        l1 = rpc.strata_l1status()
+        out["l1_cur_height"] = l1["cur_height"]
+        out["l1_last_update"] = l1["last_update"]
+        out["last_published_txid"] = l1["last_published_txid"]
+        out["published_envelope_count"] = l1["published_envelope_count"]
+
+        ss = rpc.strata_syncStatus()
+        out["tip_height"] = ss["tip_height"]
+        out["finalized_block_id"] = ss["finalized_block_id"]
+        out["finalized_slot"] = _slot_of(ss["finalized_block_id"])
+        return out
+
+    return _sample
+
+
+def _reth_sampler(svc: flexitest.Service) -> Callable[[], dict]:
+    rpc = svc.create_rpc()
+    return lambda: {"block_number": int(rpc.eth_blockNumber(), 16)}
+
+
+def _bitcoin_sampler(svc: flexitest.Service) -> Callable[[], dict]:
+    rpc = svc.create_pooled_rpc()
+    return lambda: {"height": rpc.getblockcount()}
+
+
+_SAMPLERS = {
+    KIND_SEQUENCER: _strata_sampler,
+    KIND_FULLNODE: _strata_sampler,
+    KIND_RETH: _reth_sampler,
+    KIND_BITCOIN: _bitcoin_sampler,
+}
+
+
+class ChainProgressRecorder:
+    """
+    Samples `strata_clientStatus`, `strata_l1status` and `strata_syncStatus` of the strata
+    nodes, the block number of the reth nodes and the bitcoind height at a fixed rate, on a
+    background thread. Stopped services and failing calls are recorded as missing values.
+    """
+
+    def __init__(
+        self,
+        services: dict[str, flexitest.Service],
+        interval: float = DEFAULT_SAMPLE_INTERVAL_SECS,
+    ):
+        self.interval = interval
+        self._samplers: dict[str, tuple[flexitest.Service, Callable[[], dict]]] = {}
+        for name, svc in services.items():
+            make_sampler = _SAMPLERS.get(_service_kind(svc))
+            if make_sampler is not None:
+                self._samplers[name] = (svc, make_sampler(svc))
+        self.t: list[float] = []
+        self.columns: dict[str, list] = {}
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thr.start()
+
+    def _run(self):
+        while True:
+            self._sample_all()
+            if self._stop.wait(self.interval):
+                break
+
+    def _sample_all(self):
+        row = {}
+        for name, (svc, sample) in self._samplers.items():
+            if not svc.check_status():
+                continue
+            try:
+                for k, v in sample().items():
+                    row[f"{name}.{k}"] = v
+            except Exception as ex:
+                logging.debug(f"{ex} while sampling chain progress of {name}")
+        self._append(time.time(), row)
+
+    def _append(self, t: float, row: dict[str, Any]):
+        n = len(self.t)
+        self.t.append(round(t, 3))
+        for k, v in row.items():
+            self.columns.setdefault(k, [None] * n).append(v)
+        for vs in self.columns.values():
+            if len(vs) == n:
+                vs.append(None)
+
+    def stop(self):
+        self._stop.set()
+        if self._thr.is_alive():
+            self._thr.join()
+
+    def save(self, path: str):
+        """
+        Writes the samples to `path` as gzipped JSON. String columns (block ids, txids) are
+        dictionary-encoded since they mostly repeat.
+        """
+        columns = {}
+        for k, vs in self.columns.items():
+            if any(isinstance(v, str) for v in vs):
+                values = sorted({v for v in vs if v is not None})
+                codes = {v: i for i, v in enumerate(values)}
+                columns[k] = {"dict": values, "codes": [codes.get(v) for v in vs]}
+            else:
+                columns[k] = vs
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt") as f:
+            json.dump({"interval": self.interval, "t": self.t, "columns": columns}, f)
+
+
+def load_progress(path: str) -> dict[str, list]:
+    """Loads a file written by `ChainProgressRecorder.save`, as `t` plus one list per column."""
+    with gzip.open(path, "rt") as f:
+        data = json.load(f)
+    out = {"t": data["t"]}
+    for k, col in data["columns"].items():
+        if isinstance(col, dict):
+            col = [col["dict"][c] if c is not None else None for c in col["codes"]]
+        out[k] = col
+    return out
+
+
+def _points(progress: dict[str, list], column: str) -> list[tuple[float, Any]]:
+    return [(t, v) for t, v in zip(progress["t"], progress[column]) if v is not None]
+
+
+def rate(progress: dict[str, list], column: str) -> Optional[float]:
+    """Average increase per second of a counter column, e.g. the L2 block rate of a node."""
+    pts = _points(progress, column)
+    if len(pts) < 2 or pts[-1][0] <= pts[0][0]:
+        return None
+    return (pts[-1][1] - pts[0][1]) / (pts[-1][0] - pts[0][0])
+
+
+def lag(progress: dict[str, list], ahead: str, behind: str) -> list[Optional[int]]:
+    """
+    Difference between two columns at every sample, e.g. the L1 ingestion lag is
+    `lag(p, "bitcoin.height", "sequencer.l1_cur_height")` and the finalization lag in slots
+    `lag(p, "sequencer.chain_tip_slot", "sequencer.finalized_slot")`.
+    """
+    return [
+        a - b if a is not None and b is not None else None
+        for a, b in zip(progress[ahead], progress[behind])
+    ]
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import flexitest
+
+DEFAULT_SAMPLE_INTERVAL_SECS = 1.0
+
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# Metrics summarized for every service, see `ResourceSampler.summary`.
+GAUGE_METRICS = ["cpu_pct", "rss_bytes", "threads", "datadir_bytes"]
+# Counters since process start, summarized by their increase over the test.
+COUNTER_METRICS = ["cpu_secs", "read_bytes", "write_bytes"]
+
+
+def _read_proc_stat(pid: int) -> dict:
+    with open(f"/proc/{pid}/stat") as f:
+        stat = f.read()
+    # The command name may contain spaces, the fields we want come after it.
+    fields = stat[stat.rindex(")") + 2 :].split()
+    return {
+        "cpu_secs": (int(fields[11]) + int(fields[12])) / CLK_TCK,
+        "threads": int(fields[17]),
+    }
+
+
+def _read_proc_status(pid: int) -> dict:
+    keys = {"VmRSS": "rss_bytes", "VmHWM": "peak_rss_bytes"}
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            k, _, v = line.partition(":")
+            if k in keys:
+                # Values are in kB.
+                out[keys[k]] = int(v.split()[0]) * 1024
+    return out
+
+
+def _read_proc_io(pid: int) -> dict:
+    keys = {"read_bytes", "write_bytes"}
+    out = {}
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                k, _, v = line.partition(":")
+                if k in keys:
+                    out[k] = int(v)
+    except PermissionError:
+        pass
+    return out
+
+
+def dir_size(path: str) -> int:
+    """Disk usage of a directory in bytes, like `du -s`."""
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += dir_size(entry.path)
+            else:
+                total += entry.stat(follow_symlinks=False).st_blocks * 512
+        except OSError:
+            # Files come and go while the service runs.
+            pass
+    return total
+
+
+def service_pid(svc: flexitest.Service) -> Optional[int]:
+    proc = getattr(svc, "proc", None)
+    if proc is None or proc.poll() is not None:
+        return None
+    return proc.pid
+
+
+def sample_service(svc: flexitest.Service) -> dict:
+    """
+    Takes a snapshot of the resource usage of a service, process metrics are omitted if it's
+    not running.
+    """
+    sample = {}
+    pid = service_pid(svc)
+    if pid is not None:
+        try:
+            sample.update(_read_proc_stat(pid))
+            sample.update(_read_proc_status(pid))
+            sample.update(_read_proc_io(pid))
+        except (FileNotFoundError, ProcessLookupError):
+            # Exited in the meantime.
+            pass
+    datadir = getattr(svc, "datadir", None)
+    if datadir is not None:
+        sample["datadir_bytes"] = dir_size(datadir)
+    return sample
+
+
+class ResourceSampler:
+    """
+    Samples the CPU, memory, I/O and datadir size of a set of services on a background thread,
+    keeping a time series per service.
+    """
+
+    def __init__(
+        self,
+        services: dict[str, flexitest.Service],
+        interval: float = DEFAULT_SAMPLE_INTERVAL_SECS,
+    ):
+        self.services = services
+        self.interval = interval
+        # service -> metric -> values, all series of a service have the same length as its `t`
+        self.series: dict[str, dict[str, list]] = {name: {"t": []} for name in services}
+        self._last_cpu: dict[str, tuple[float, float]] = {}
+        self._start = time.monotonic()
+        self._stop = threading.Event()
+        self._thr = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thr.start()
+
+    def _run(self):
+        while True:
+            self._sample_all()
+            if self._stop.wait(self.interval):
+                break
+
+    def _sample_all(self):
+        for name, svc in self.services.items():
+            t = time.monotonic()
+            sample = sample_service(svc)
+
+            cpu = sample.get("cpu_secs")
+            if cpu is not None:
+                last = self._last_cpu.get(name)
+                if last is not None and t > last[0]:
+                    # The counter starts over when the service is restarted.
+                    used = max(cpu - last[1], 0)
+                    sample["cpu_pct"] = round(100 * used / (t - last[0]), 1)
+                self._last_cpu[name] = (t, cpu)
+
+            self._append(name, t - self._start, sample)
+
+    def _append(self, name: str, t: float, sample: dict):
+        series = self.series[name]
+        n = len(series["t"])
+        series["t"].append(round(t, 3))
+        for k, v in sample.items():
+            # Pad series of metrics that were missing in earlier samples.
+            series.setdefault(k, [None] * n).append(v)
+        for vs in series.values():
+            if len(vs) == n:
+                vs.append(None)
+
+    def stop(self):
+        """Stops sampling."""
+        self._stop.set()
+        if self._thr.is_alive():
+            self._thr.join()
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Peak and mean of the gauges of every service, and the increase of its counters. The
+        datadir size also gets its growth over the test.
+        """
+        out = {}
+        for name, series in self.series.items():
+            svc_summary = {}
+            for metric in GAUGE_METRICS:
+                values = [v for v in series.get(metric, []) if v is not None]
+                if values:
+                    svc_summary[metric] = {
+                        "peak": max(values),
+                        "mean": round(sum(values) / len(values), 2),
+                    }
+                    if metric == "datadir_bytes":
+                        svc_summary[metric]["growth"] = values[-1] - values[0]
+            for metric in COUNTER_METRICS:
+                values = [v for v in series.get(metric, []) if v is not None]
+                if values:
+                    # Restarts reset the counters, so only count the increases.
+                    incr = sum(max(b - a, 0) for a, b in zip(values, values[1:]))
+                    svc_summary[metric] = {"total": round(incr, 2)}
+            out[name] = svc_summary
+        return out
+
+    def save(self, path: str):
+        """Writes the time series to `path` as JSON, one column per metric."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"interval": self.interval, "services": self.series}, f)
@@ -1,8 +1,11 @@
 import json
+from typing import Optional
 
 import requests
 from websockets.sync.client import connect as wsconnect
 
+from factory.trace import CAT_RPC, TRACE
+
 
 class RpcError(Exception):
     def __init__(self, code: int, msg: str, data=None):
@@ -57,6 +60,8 @@ class JsonrpcClient:
     def __init__(self, url: str):
         self.url = url
         self.req_idx = 0
+        # Name of the service, used to label the calls in traces.
+        self.service_name: Optional[str] = None
         # Hook that lets us add a check that runs before every call.
         self._pre_call_hook = None
 
@@ -73,7 +78,8 @@ class JsonrpcClient:
         self._do_pre_call_check(method)
         req = _make_request(method, self.req_idx, args)
         self.req_idx += 1
-        resp = _dispatch_request(self.url, req)
+        with TRACE.span(method, CAT_RPC, {"service": self.service_name or self.url}):
+            resp = _dispatch_request(self.url, req)
         return _handle_response(resp)
 
     def __getattr__(self, name: str):
@@ -0,0 +1,144 @@
+"""
+Accounting of the time tests spend in `time.sleep`, per test and per call site.
+
+`time.sleep` is replaced by a wrapper calling the registered hooks after every sleep. Sleeps
+made by the polling helpers (see `wait_helper`) are attributed to the caller of the helper.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from types import FrameType
+from typing import Callable, Optional
+
+# Kinds of sleeps.
+KIND_SLEEP = "sleep"
+KIND_WAIT_STEP = "wait_step"
+
+# Hook called after every sleep, with the requested duration, the calling frame and the actual
+# start and end times (`time.perf_counter`).
+SleepHook = Callable[[float, FrameType, float, float], None]
+
+_real_sleep = time.sleep
+_hooks: list[SleepHook] = []
+_wait_helpers: set = set()
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _hooked_sleep(secs: float):
+    start = time.perf_counter()
+    _real_sleep(secs)
+    end = time.perf_counter()
+    frame = sys._getframe(1)
+    for hook in _hooks:
+        hook(secs, frame, start, end)
+
+
+def add_sleep_hook(hook: SleepHook):
+    """Registers a hook called after every `time.sleep`, installing the wrapper if needed."""
+    _hooks.append(hook)
+    time.sleep = _hooked_sleep
+
+
+def wait_helper(fn):
+    """
+    Marks a polling helper such as `wait_until`, whose step sleeps are attributed to the caller.
+    """
+    _wait_helpers.add(fn.__code__)
+    return fn
+
+
+def call_site(frame: FrameType) -> tuple[str, str]:
+    """Returns the call site of a sleep as `file:line (function)`, and the kind of sleep."""
+    kind = KIND_SLEEP
+    if frame.f_code in _wait_helpers and frame.f_back is not None:
+        kind = KIND_WAIT_STEP
+        frame = frame.f_back
+    path = frame.f_code.co_filename
+    if path.startswith(_ROOT_DIR):
+        path = os.path.relpath(path, _ROOT_DIR)
+    return f"{path}:{frame.f_lineno} ({frame.f_code.co_name})", kind
+
+
+class SleepProfiler:
+    """
+    Sums up the sleeps made by a test while it runs, by call site. Only the thread running the
+    test is accounted for, sleeps of background threads don't hold the test up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._test: Optional[str] = None
+        self._test_thread: Optional[int] = None
+        # (test, site, kind) -> [count, secs]
+        self._totals: dict[tuple[str, str, str], list] = defaultdict(lambda: [0, 0.0])
+
+    def enable(self):
+        add_sleep_hook(self._on_sleep)
+
+    def set_test(self, name: Optional[str]):
+        """Sets the test running on the calling thread, or `None` once it's over."""
+        with self._lock:
+            self._test = name
+            self._test_thread = threading.get_ident() if name is not None else None
+
+    def _on_sleep(self, secs: float, frame: FrameType, start: float, end: float):
+        if self._test is None or threading.get_ident() != self._test_thread:
+            return
+        site, kind = call_site(frame)
+        with self._lock:
+            entry = self._totals[(self._test, site, kind)]
+            entry[0] += 1
+            entry[1] += end - start
+
+    def report(self) -> dict:
+        """
+        Idle seconds per test and per call site, sorted by decreasing time. Sites are also
+        broken down per test.
+        """
+        with self._lock:
+            totals = dict(self._totals)
+
+        tests = defaultdict(lambda: {"total_secs": 0.0, "sites": []})
+        sites = defaultdict(lambda: {"count": 0, "total_secs": 0.0, "tests": 0})
+        for (test, site, kind), (count, secs) in totals.items():
+            tests[test]["total_secs"] += secs
+            tests[test]["sites"].append(
+                {"site": site, "kind": kind, "count": count, "total_secs": round(secs, 3)}
+            )
+            s = sites[(site, kind)]
+            s["count"] += count
+            s["total_secs"] += secs
+            s["tests"] += 1
+
+        for t in tests.values():
+            t["total_secs"] = round(t["total_secs"], 3)
+            t["sites"].sort(key=lambda s: s["total_secs"], reverse=True)
+        site_list = [
+            {"site": site, "kind": kind, **s, "total_secs": round(s["total_secs"], 3)}
+            for (site, kind), s in sites.items()
+        ]
+        site_list.sort(key=lambda s: s["total_secs"], reverse=True)
+
+        return {
+            "total_secs": round(sum(t["total_secs"] for t in tests.values()), 3),
+            "tests": dict(sorted(tests.items(), key=lambda t: t[1]["total_secs"], reverse=True)),
+            "sites": site_list,
+        }
+
+
+# Profiler shared by the whole harness.
+SLEEPS = SleepProfiler()
+
+
+def format_sites(report: dict, limit: int = 15) -> str:
+    lines = [f"Time spent sleeping in tests: {report['total_secs']:.2f}s"]
+    for s in report["sites"][:limit]:
+        lines.append(
+            f"{s['total_secs']:>10.2f}s  {s['kind']:<9} {s['site']} (x{s['count']}, "
+            f"{s['tests']} tests)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,149 @@
+"""
+Timeline of a test in the Trace Event Format, viewable in `chrome://tracing` or Perfetto.
+
+RPC calls, waits and sleeps are recorded as spans on the harness thread that made them, and
+service starts, stops and crashes on one lane per service. Recording is off unless enabled,
+see `TraceRecorder.enable`.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Optional
+
+from factory.sleeps import add_sleep_hook
+
+# Trace "processes" the lanes are grouped under.
+HARNESS_PID = 1
+SERVICES_PID = 2
+
+# Event categories.
+CAT_RPC = "rpc"
+CAT_WAIT = "wait"
+CAT_SLEEP = "sleep"
+CAT_SERVICE = "service"
+
+
+class TraceRecorder:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: list[dict] = []
+        self._tids: dict[tuple[int, Any], int] = {}
+
+    def enable(self):
+        """Starts recording, also tracing every `time.sleep`."""
+        self.enabled = True
+        add_sleep_hook(self._on_sleep)
+
+    def _on_sleep(self, secs: float, frame: FrameType, start: float, end: float):
+        self.complete("sleep", CAT_SLEEP, start, end, {"secs": secs})
+
+    def _ts(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _lane(self, service: Optional[str]) -> tuple[int, int]:
+        """Returns the (pid, tid) of a service lane, or of the calling thread's lane."""
+        if service is not None:
+            key, pid, name = (SERVICES_PID, service), SERVICES_PID, service
+        else:
+            thr = threading.current_thread()
+            key, pid, name = (HARNESS_PID, thr.ident), HARNESS_PID, thr.name
+        tid = self._tids.get(key)
+        if tid is None:
+            tid = self._tids[key] = len(self._tids) + 1
+            self._events.append(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            )
+        return pid, tid
+
+    def _add(self, event: dict, service: Optional[str]):
+        with self._lock:
+            event["pid"], event["tid"] = self._lane(service)
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, cat: str, args: Optional[dict] = None, service: Optional[str] = None):
+        """
+        Records the body of the `with` block as a complete event. The yielded dict can be used
+        to add args once the span is done, e.g. a poll count.
+        """
+        args = dict(args or {})
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.complete(name, cat, start, time.perf_counter(), args, service)
+
+    def complete(
+        self,
+        name: str,
+        cat: str,
+        start: float,
+        end: float,
+        args: Optional[dict] = None,
+        service: Optional[str] = None,
+    ):
+        """Records a complete event between two `time.perf_counter` times."""
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": self._ts(start),
+            "dur": round((end - start) * 1e6, 1),
+            "args": args or {},
+        }
+        self._add(event, service)
+
+    def instant(
+        self, name: str, cat: str, args: Optional[dict] = None, service: Optional[str] = None
+    ):
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "i",
+            "s": "t",
+            "ts": self._ts(time.perf_counter()),
+            "args": args or {},
+        }
+        self._add(event, service)
+
+    def _take(self) -> list[dict]:
+        with self._lock:
+            events, self._events, self._tids = self._events, [], {}
+        return events
+
+    def discard(self):
+        """Drops the events recorded so far."""
+        self._take()
+
+    def save(self, path: str):
+        """
+        Writes the events recorded so far to `path` and starts over, so that every test gets
+        the events since the previous one finished (including the init of its env).
+        """
+        if not self.enabled:
+            return
+        events = self._take()
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+            for pid, name in ((HARNESS_PID, "harness"), (SERVICES_PID, "services"))
+        ]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f)
+
+
+# Recorder shared by the whole harness.
+TRACE = TraceRecorder()
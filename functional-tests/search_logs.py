@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+
+from utils.constants import DD_ROOT
+from utils.logindex import LEVELS, index_datadir, parse_time, query_datadir
+
+
+def last_run_dir(dd_root: str) -> str:
+    runs = [os.path.join(dd_root, d) for d in os.listdir(dd_root)]
+    runs = [d for d in runs if os.path.isdir(d)]
+    if not runs:
+        raise SystemExit(f"no test runs in {dd_root}")
+    return max(runs, key=os.path.getmtime)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Search the service logs of a test run, e.g. all the errors between two "
+        "timestamps across services.",
+    )
+    parser.add_argument(
+        "datadir",
+        nargs="?",
+        help=f"run (or env/service) datadir to search, defaults to the last run in {DD_ROOT}",
+    )
+    parser.add_argument("-s", "--since", help="start time, ISO 8601 UTC or secs since epoch")
+    parser.add_argument("-u", "--until", help="end time, ISO 8601 UTC or secs since epoch")
+    parser.add_argument("-l", "--level", choices=LEVELS, help="minimum level")
+    parser.add_argument("-t", "--target", help="substring of the target module")
+    parser.add_argument("-S", "--service", help="substring of the service, e.g. basic/sequencer")
+    parser.add_argument("-e", "--regex", help="regex the entry text must match")
+    parser.add_argument("-n", "--limit", type=int, help="max number of entries to print")
+    parser.add_argument("--reindex", action="store_true", help="rebuild all indexes first")
+    args = parser.parse_args(argv[1:])
+
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    datadir = args.datadir or last_run_dir(os.path.join(root_dir, DD_ROOT))
+    # Otherwise the logs of the queried services are indexed on first use.
+    if args.reindex:
+        index_datadir(datadir, force=True)
+
+    entries = query_datadir(
+        datadir,
+        service=args.service,
+        start=parse_time(args.since) if args.since else None,
+        end=parse_time(args.until) if args.until else None,
+        min_level=args.level,
+        target=args.target,
+        pattern=args.regex,
+    )
+    for i, entry in enumerate(entries):
+        if args.limit is not None and i >= args.limit:
+            break
+        print(entry)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
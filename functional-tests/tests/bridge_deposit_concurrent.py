@@ -0,0 +1,47 @@
+import asyncio
+
+import flexitest
+
+from envs import testenv
+from utils import deposit_request_transaction_async, get_bridge_pubkey
+
+
+@flexitest.register
+class BridgeDepositConcurrentTest(testenv.BridgeTestBase):
+    """
+    Builds two DRTs concurrently from the same wallet and checks bitcoind accepts both, i.e.
+    they don't spend the same UTXOs.
+    """
+
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env(testenv.BasicEnvConfig(101))
+
+    def main(self, ctx: flexitest.RunContext):
+        bridge_pk = get_bridge_pubkey(self.seqrpc)
+        btc_url = self.btcrpc.base_url
+        btc_user = self.btc.get_prop("rpc_user")
+        btc_password = self.btc.get_prop("rpc_password")
+        el_addresses = [ctx.env.gen_el_address() for _ in range(2)]
+
+        async def _build_all():
+            return await asyncio.gather(
+                *(
+                    deposit_request_transaction_async(
+                        el_address, bridge_pk, btc_url, btc_user, btc_password
+                    )
+                    for el_address in el_addresses
+                )
+            )
+
+        txs = [bytes(tx).hex() for tx in asyncio.run(_build_all())]
+
+        inputs = []
+        for tx in txs:
+            vin = self.btcrpc.proxy.decoderawtransaction(tx)["vin"]
+            inputs.append({(i["txid"], i["vout"]) for i in vin})
+        assert not inputs[0] & inputs[1], "DRTs built concurrently spend the same UTXOs"
+
+        txids = [self.btcrpc.proxy.sendrawtransaction(tx) for tx in txs]
+        mempool = self.btcrpc.proxy.getrawmempool()
+        for txid in txids:
+            assert txid in mempool, f"DRT {txid} not in the mempool"
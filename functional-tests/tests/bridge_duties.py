@@ -3,7 +3,8 @@ from bitcoinlib.services.bitcoind import BitcoindClient
 
 from envs import testenv
 from envs.rollup_params_cfg import RollupConfig
-from utils import broadcast_tx, wait_until
+from factory.btczmq import TOPIC_HASHBLOCK
+from utils import broadcast_tx
 from utils.constants import SEQ_PUBLISH_BATCH_INTERVAL_SECS
 
 
@@ -52,10 +53,16 @@ class BridgeDutiesTest(testenv.StrataTester):
                 # add robustness by spreading out requests across blocks
                 self.debug(f"sent deposit request #{j} with txid = {txid} to block #{i}")
 
-        # wait for the transactions to have at least 2 confirmations
-        wait_until(
-            lambda: all(btcrpc.proxy.gettransaction(txid)["confirmations"] >= 2 for txid in txids),
+        # wait for the transactions to have at least 2 confirmations, polling all of them in a
+        # single batch request whenever a new block is announced
+        pooled_rpc = btc.create_pooled_rpc()
+        btc.zmq_hub().wait_until(
+            lambda: all(
+                tx["confirmations"] >= 2
+                for tx in pooled_rpc.batch([("gettransaction", [txid]) for txid in txids])
+            ),
             timeout=SEQ_PUBLISH_BATCH_INTERVAL_SECS * 2,
+            topics=[TOPIC_HASHBLOCK],
         )
 
         operator_idx = 0
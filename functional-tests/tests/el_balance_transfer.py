@@ -1,5 +1,3 @@
-import time
-
 import flexitest
 from web3 import Web3
 
@@ -32,11 +30,11 @@ class ElBalanceTransferTest(testenv.StrataTester):
 
         to_transfer = 1_000_000_000_000_000_000
 
-        web3.eth.send_transaction(
+        txid = web3.eth.send_transaction(
             {"to": dest, "value": hex(to_transfer), "gas": hex(100000), "from": source}
         )
 
-        time.sleep(2)
+        reth.heads_hub().wait_for_receipt(web3, txid)
 
         final_block_no = web3.eth.block_number
         dest_final_balance = web3.eth.get_balance(dest)
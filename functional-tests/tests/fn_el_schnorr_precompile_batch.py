@@ -0,0 +1,63 @@
+import hashlib
+from collections import Counter
+
+import flexitest
+from strata_utils import sign_schnorr_sigs, verify_schnorr_sigs
+from web3 import Web3
+
+from envs import testenv
+from utils import send_schnorr_precompile_calls, split_schnorr_precompile_inputs, wait_for_receipts
+from utils.constants import PRECOMPILE_SCHNORR_ADDRESS
+
+# Number of precompile calls fired in one go
+NUM_CALLS = 100
+
+
+@flexitest.register
+class SchnorrPrecompileBatchTest(testenv.StrataTester):
+    def __init__(self, ctx: flexitest.InitContext):
+        ctx.set_env("basic")
+
+    def main(self, ctx: flexitest.RunContext):
+        """
+        Fires many Schnorr precompile calls at once, so that several of them land in the same
+        block, and checks that the on-chain results match the ones computed locally.
+
+        Per-block tx counts and gas usage are logged to track precompile throughput.
+        """
+        reth = ctx.get_service("reth")
+        web3: Web3 = reth.create_web3()
+        assert web3.is_connected(), "cannot connect to reth"
+
+        secret_key = "a9f913c3d7fe56c462228ad22bb7631742a121a6a138d57c1fc4a351314948fa"
+        messages = [
+            hashlib.sha256(f"AlpenStrata{i}".encode()).hexdigest() for i in range(NUM_CALLS)
+        ]
+
+        packed = sign_schnorr_sigs(messages, secret_key)
+        local_results = verify_schnorr_sigs(packed)
+        assert local_results == b"\x01" * NUM_CALLS, "local Schnorr verification failed"
+
+        txids = send_schnorr_precompile_calls(web3, packed)
+        receipts = wait_for_receipts(web3, txids, timeout=60)
+        assert all(r.status == 1 for r in receipts), "precompile transaction failed"
+
+        txs_per_block = Counter(r.blockNumber for r in receipts)
+        gas_per_block = Counter()
+        for r in receipts:
+            gas_per_block[r.blockNumber] += r.gasUsed
+        for blkno in sorted(txs_per_block):
+            self.info(
+                f"block {blkno}: {txs_per_block[blkno]} precompile calls, "
+                f"{gas_per_block[blkno]} gas"
+            )
+        assert max(txs_per_block.values()) > 1, "expected several precompile calls per block"
+
+        # Spot check the precompile output against the local verification.
+        dest = web3.to_checksum_address(PRECOMPILE_SCHNORR_ADDRESS)
+        inputs = split_schnorr_precompile_inputs(packed)
+        for idx in (0, NUM_CALLS - 1):
+            data = web3.eth.call({"to": dest, "data": inputs[idx]})
+            assert data == local_results[idx : idx + 1], f"unexpected precompile output {data}"
+
+        return True
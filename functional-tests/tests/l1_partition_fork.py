@@ -0,0 +1,58 @@
+import flexitest
+
+from envs import testenv
+from envs.topology import L1Spec, Topology, TopologyEnvConfig
+from utils import wait_until
+
+SEQ_NODE = 0
+MINER_NODE = 1
+
+
+@flexitest.register
+class L1PartitionForkTest(testenv.StrataTester):
+    """
+    Splits the bitcoind of the sequencer from the one mining, lets each of them mine its own
+    fork, then heals them and checks the sequencer follows the longer fork it was cut off from.
+    """
+
+    def __init__(self, ctx: flexitest.InitContext):
+        topology = Topology(
+            fullnodes=[],
+            l1=L1Spec(2, sequencer=SEQ_NODE, operators=MINER_NODE, miner=MINER_NODE),
+        )
+        ctx.set_env(TopologyEnvConfig(topology, 101, auto_generate_blocks=False))
+
+    def main(self, ctx: flexitest.RunContext):
+        seqrpc = ctx.get_service("seq_node").create_rpc()
+        l1 = ctx.env.l1
+        seq_btc = l1.rpc(SEQ_NODE)
+        miner_btc = l1.rpc(MINER_NODE)
+        addr = ctx.get_service("seq_node").get_prop("address")
+
+        fork_height = seq_btc.getblockcount() + 1
+        wait_until(
+            lambda: seqrpc.strata_l1status()["cur_height"] == fork_height - 1,
+            error_with="Sequencer did not reach the L1 tip",
+            timeout=30,
+        )
+
+        l1.partition([[SEQ_NODE], [MINER_NODE]])
+        seq_btc.generatetoaddress(2, addr)
+        miner_btc.generatetoaddress(4, addr)
+        wait_until(
+            lambda: seqrpc.strata_l1status()["cur_height"] == fork_height + 1,
+            error_with="Sequencer did not follow its own fork",
+            timeout=30,
+        )
+        orphaned = seqrpc.strata_getL1blockHash(fork_height)
+
+        l1.heal()
+        l1.wait_synced()
+        assert seq_btc.getblockcount() == fork_height + 3, "Longer fork should win"
+
+        wait_until(
+            lambda: seqrpc.strata_l1status()["cur_height"] == fork_height + 3
+            and seqrpc.strata_getL1blockHash(fork_height) != orphaned,
+            error_with="Sequencer did not switch to the longer fork",
+            timeout=30,
+        )
@@ -0,0 +1,30 @@
+import flexitest
+
+from envs import testenv
+from envs.topology import WALLET_FUNDING_BTC, L1Spec, Topology, TopologyEnvConfig
+
+N_BITCOINDS = 3
+
+
+@flexitest.register
+class L1TopologyWalletsTest(testenv.StrataTester):
+    """
+    Checks that the wallet of every bitcoind of a topology is funded, not only the one the
+    premine went to, so that services attached to any of them can spend.
+    """
+
+    def __init__(self, ctx: flexitest.InitContext):
+        topology = Topology(
+            fullnodes=[],
+            l1=L1Spec(N_BITCOINDS, sequencer=0, fullnodes=1, operators=2, miner=0),
+        )
+        ctx.set_env(TopologyEnvConfig(topology, 101, auto_generate_blocks=False))
+
+    def main(self, ctx: flexitest.RunContext):
+        l1 = ctx.env.l1
+        for i in range(N_BITCOINDS):
+            balance = l1.rpc(i).getbalance()
+            if i == 0:
+                assert balance > 0, "Sequencer wallet has no premined funds"
+            else:
+                assert balance == WALLET_FUNDING_BTC, f"Wallet of bitcoind {i} not funded"
@@ -10,6 +10,7 @@ from utils import (
     ManualGenBlocksConfig,
     check_nth_checkpoint_finalized,
     check_submit_proof_fails_for_nonexistent_batch,
+    get_broadcast_idx,
     submit_checkpoint,
     wait_until,
 )
@@ -101,6 +102,13 @@ def check_nth_checkpoint_finalized_on_reorg(
     blockheight = txinfo["blockheight"]
     blockhash = btcrpc.proxy.getblockhash(blockheight)
 
+    # The broadcaster notices the reorg and publishes the tx again, register the wait for it
+    # before triggering the reorg so the log line can't be missed. The tx is logged with its
+    # index in the broadcaster database.
+    bcast_idx = get_broadcast_idx(seqrpc, btcrpc, published_txid)
+    assert bcast_idx is not None, "Published tx not found in the broadcaster"
+    republished = seq.log_tailer().expect(rf"Successfully published tx idx={bcast_idx}\b")
+
     # Now invalidate the block
     btcrpc.proxy.invalidateblock(blockhash)
 
@@ -108,11 +116,10 @@ def check_nth_checkpoint_finalized_on_reorg(
     txinfo = btcrpc.proxy.gettransaction(published_txid)
     assert txinfo["confirmations"] == 0, "Tx should have 0 confirmations"
 
-    # Wait until the tx is possibly republished to l1(Will be republished if
-    # inputs changed after reorg, or else the tx will be the same.
-    # NOTE: This would ideally be done using `wait_until` but due to some issues with tracking
-    # `last_published_txid` in L1Status, need to do this sleep wait hack
-    time.sleep(4)
+    # Wait until the same tx is republished to l1, its inputs are still unspent after the reorg.
+    # `last_published_txid` in L1Status can't be used for this as it is not updated on
+    # republish, so wait on the broadcaster log instead.
+    republished.wait(timeout=10, error_with="Tx was not republished after reorg")
 
     new_addr = btcrpc.proxy.getnewaddress()
     # Create a block so that the envelope is included
@@ -1,6 +1,8 @@
 BD_USERNAME = "alpen"
 BD_PASSWORD = "alpen"
 DD_ROOT = "_dd"
+# Pre-mined bitcoind chains reused across runs, see `BasicEnvConfig.use_chain_template`
+CHAIN_TEMPLATES_ROOT = "_chain_templates"
 # keep in sync with `strata-consensus-logic::genesis::MAX_HORIZON_POLL_INTERVAL`
 MAX_HORIZON_POLL_INTERVAL_SECS = 1
 SEQ_SLACK_TIME_SECS = 2  # to account for thread sync and startup times
@@ -14,6 +16,8 @@ ERROR_CHECKPOINT_DOESNOT_EXIST = -32610
 # custom precompiles
 PRECOMPILE_BRIDGEOUT_ADDRESS = "0x5400000000000000000000000000000000000001"
 PRECOMPILE_SCHNORR_ADDRESS = "0x5400000000000000000000000000000000000002"
+# public key (32) + message hash (32) + signature (64)
+SCHNORR_PRECOMPILE_INPUT_LEN = 128
 
 # Unspendable address
 # Taken from python-strata-utils:
@@ -31,3 +35,7 @@ DEFAULT_OPERATOR_CNT = 2
 DEFAULT_PROOF_TIMEOUT = 30  # Secs
 DEFAULT_MESSAGE_INTERVAL_MSEC = 500
 DEFAULT_TAKEBACK_TIMEOUT = 1008  # Blocks (1 week)
+
+# Prover client
+DEFAULT_PROVER_NATIVE_WORKERS = 20
+DEFAULT_PROVER_LOOP_INTERVAL_MSEC = 100
@@ -0,0 +1,229 @@
+"""
+Load generation against the EL: value transfers from many pre-funded accounts at a fixed rate,
+with inclusion tracked per block through the newHeads subscription of reth.
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from eth_account.signers.local import LocalAccount
+from web3 import Web3
+
+from factory.ethsub import TOPIC_NEW_HEADS, NewHeadsHub
+from utils.utils import wait_for_receipts
+
+TRANSFER_GAS = 21_000
+# Number of threads sending transactions, so that slow calls don't hold up the pacing.
+SENDER_THREADS = 8
+
+
+def bench_accounts(web3: Web3, n: int, seed: str = "el-load") -> list[LocalAccount]:
+    """Deterministic accounts, so that reruns against the same chain reuse their funds."""
+    return [
+        web3.eth.account.from_key(hashlib.sha256(f"{seed}-{i}".encode()).digest()) for i in range(n)
+    ]
+
+
+def fund_accounts(web3: Web3, accounts: list[LocalAccount], amount: int, timeout: int = 60):
+    """Sends `amount` wei to each account from the dev account and waits for inclusion."""
+    source = web3.address
+    nonce = web3.eth.get_transaction_count(source, "pending")
+    txids = []
+    for i, acct in enumerate(accounts):
+        txid = web3.eth.send_transaction(
+            {
+                "to": acct.address,
+                "value": hex(amount),
+                "gas": hex(TRANSFER_GAS),
+                "from": source,
+                "nonce": nonce + i,
+            }
+        )
+        txids.append(txid)
+    receipts = wait_for_receipts(web3, txids, timeout=timeout)
+    assert all(r.status == 1 for r in receipts), "funding transaction failed"
+
+
+@dataclass
+class BlockStats:
+    number: int
+    tx_count: int
+    gas_used: int
+    gas_limit: int
+    seen_at: float
+
+
+@dataclass
+class LoadResult:
+    rate: float
+    submitted: int = 0
+    rejected: int = 0
+    # tx hash -> submit to inclusion latency, in secs
+    latencies: dict[str, float] = field(default_factory=dict)
+    blocks: list[BlockStats] = field(default_factory=list)
+    first_submit: Optional[float] = None
+    last_inclusion: Optional[float] = None
+
+    @property
+    def included(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def dropped(self) -> int:
+        return self.submitted - self.rejected - self.included
+
+    @property
+    def accepted_tps(self) -> float:
+        if not self.latencies or self.first_submit is None or self.last_inclusion is None:
+            return 0.0
+        return self.included / max(self.last_inclusion - self.first_submit, 1e-9)
+
+
+class InclusionTracker:
+    """
+    Records when submitted transactions land in a block. Every new head announced by reth is
+    fetched with its tx hashes, so inclusion is observed once per block rather than by polling
+    receipts. Heads are only followed between `start` and `stop`.
+    """
+
+    def __init__(self, web3: Web3, hub: NewHeadsHub):
+        self.web3 = web3
+        self.hub = hub
+        self._lock = threading.Lock()
+        self._pending: dict[str, float] = {}
+        self._result: Optional[LoadResult] = None
+
+    def start(self, result: LoadResult):
+        with self._lock:
+            self._pending = {}
+            subscribed = self._result is not None
+            self._result = result
+        if not subscribed:
+            self.hub.subscribe(TOPIC_NEW_HEADS, self._on_head)
+
+    def submitted(self, txhash: str, at: float):
+        with self._lock:
+            self._pending[txhash] = at
+
+    def forget(self, txhash: str):
+        with self._lock:
+            self._pending.pop(txhash, None)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def included(self) -> dict[str, float]:
+        """Inclusion latencies of the transactions included so far, by tx hash."""
+        with self._lock:
+            return dict(self._result.latencies) if self._result is not None else {}
+
+    def stop(self):
+        self.hub.unsubscribe(TOPIC_NEW_HEADS, self._on_head)
+        with self._lock:
+            self._result = None
+
+    def _on_head(self, head: dict):
+        seen_at = time.perf_counter()
+        if self._result is None:
+            return
+        block = self.web3.eth.get_block(int(head["number"], 16))
+        with self._lock:
+            result = self._result
+            if result is None:
+                return
+            stats = BlockStats(
+                block.number, len(block.transactions), block.gasUsed, block.gasLimit, seen_at
+            )
+            result.blocks.append(stats)
+            for tx in block.transactions:
+                submitted_at = self._pending.pop(tx.to_0x_hex(), None)
+                if submitted_at is not None:
+                    result.latencies[tx.to_0x_hex()] = seen_at - submitted_at
+                    result.last_inclusion = seen_at
+
+
+class TransferLoad:
+    """
+    Drives value transfers at a given rate, round-robin over `accounts`. Transactions are
+    signed ahead of each run, so that signing doesn't limit the achievable rate.
+    """
+
+    def __init__(self, web3: Web3, hub: NewHeadsHub, accounts: list[LocalAccount]):
+        self.web3 = web3
+        self.accounts = accounts
+        self.chain_id = web3.eth.chain_id
+        self.dest = web3.to_checksum_address("0x000000000000000000000000000000000000dead")
+        self.tracker = InclusionTracker(web3, hub)
+        self._nonces: dict[str, int] = {}
+
+    def _sync_nonces(self):
+        # Rejected transactions leave nonce gaps, so start every run from the pending state.
+        for acct in self.accounts:
+            self._nonces[acct.address] = self.web3.eth.get_transaction_count(
+                acct.address, "pending"
+            )
+
+    def _sign_txs(self, count: int) -> list[bytes]:
+        gas_price = self.web3.eth.gas_price * 2
+        raws = []
+        for i in range(count):
+            acct = self.accounts[i % len(self.accounts)]
+            tx = {
+                "to": self.dest,
+                "value": 1,
+                "gas": TRANSFER_GAS,
+                "gasPrice": gas_price,
+                "nonce": self._nonces[acct.address],
+                "chainId": self.chain_id,
+            }
+            self._nonces[acct.address] += 1
+            raws.append(acct.sign_transaction(tx).raw_transaction)
+        return raws
+
+    def run(self, rate: float, duration: float, drain_timeout: float = 30) -> LoadResult:
+        """
+        Sends `rate * duration` transfers paced at `rate` per second, then waits up to
+        `drain_timeout` for them to be included.
+        """
+        self._sync_nonces()
+        raws = self._sign_txs(int(rate * duration))
+        result = LoadResult(rate)
+        self.tracker.start(result)
+        try:
+            self._send_all(raws, rate, result)
+            deadline = time.perf_counter() + drain_timeout
+            while self.tracker.pending() > 0 and time.perf_counter() < deadline:
+                time.sleep(0.2)
+        finally:
+            self.tracker.stop()
+        return result
+
+    def _send_all(self, raws: list[bytes], rate: float, result: LoadResult):
+        """Sends the signed transactions paced at `rate` per second."""
+        lock = threading.Lock()
+
+        def _send(raw: bytes):
+            # Registered before sending, the tx may be included before the call returns.
+            txhash = Web3.keccak(raw).to_0x_hex()
+            self.tracker.submitted(txhash, time.perf_counter())
+            try:
+                self.web3.eth.send_raw_transaction(raw)
+            except Exception:
+                self.tracker.forget(txhash)
+                with lock:
+                    result.rejected += 1
+
+        start = time.perf_counter()
+        result.first_submit = start
+        with ThreadPoolExecutor(max_workers=SENDER_THREADS) as pool:
+            for i, raw in enumerate(raws):
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(_send, raw)
+                result.submitted += 1
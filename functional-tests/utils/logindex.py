@@ -0,0 +1,274 @@
+"""
+Compact on-disk index over service logs, for fast post-mortem queries.
+
+For every `service.log` an index file `service.log.idx` is written next to it, holding one
+fixed-size record per log entry (timestamp, level, target module, byte offset), plus a small
+`service.log.idx.json` sidecar with the target names and the log size it was built from.
+Queries binary-search the mmapped index by time and only touch the matching entries of the log.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+LOG_FILE_NAME = "service.log"
+INDEX_SUFFIX = ".idx"
+META_SUFFIX = ".idx.json"
+
+INDEX_MAGIC = b"STLOGIDX"
+INDEX_VERSION = 1
+# magic, version, record size
+HEADER = struct.Struct("<8sII")
+# timestamp (secs since epoch), byte offset, target id, level
+RECORD = struct.Struct("<dQHBx")
+
+LEVELS = ["TRACE", "DEBUG", "INFO", "WARN", "ERROR"]
+
+# `<timestamp>  <LEVEL> <spans:> <target>: <message>`, as written by `tracing_subscriber`'s
+# compact formatter (strata binaries, reth). bitcoind lines only have the timestamp.
+_TS_RE = re.compile(rb"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?)Z\s+")
+_LEVEL_RE = re.compile(rb"(TRACE|DEBUG|INFO|WARN|ERROR)\s+")
+# Spans, with or without fields, then the target, preferring a module path when a bare word
+# could be either a span or a single-segment target such as `reth`.
+_SPANS = rb"(?:\S+\{[^}]*\}:\s+|\w+:\s+)*?"
+_TARGET_RE = re.compile(_SPANS + rb"([A-Za-z_]\w*(?:::\w+)+):\s")
+_CRATE_TARGET_RE = re.compile(rb"(?:\S+\{[^}]*\}:\s+)*([A-Za-z_]\w*):\s")
+_BITCOIND_LEVEL_RE = re.compile(rb"\[(warning|error)\]")
+
+
+def _parse_ts(ts: bytes) -> float:
+    # `fromisoformat` in python 3.10 can't handle more than 6 fractional digits or the `Z`.
+    s = ts.decode()
+    if "." in s:
+        base, frac = s.split(".")
+        s = f"{base}.{frac[:6]:0<6}"
+    return datetime.fromisoformat(s + "+00:00").timestamp()
+
+
+def line_timestamp(line: bytes) -> Optional[float]:
+    """Timestamp of a log line, in secs since epoch, None if it doesn't start with one."""
+    m = _TS_RE.match(line)
+    return _parse_ts(m.group(1)) if m else None
+
+
+def parse_time(s: str) -> float:
+    """Parses a CLI/API time, either seconds since epoch or an ISO 8601 UTC timestamp."""
+    try:
+        return float(s)
+    except ValueError:
+        return _parse_ts(s.removesuffix("Z").encode())
+
+
+def _parse_line(line: bytes) -> Optional[tuple[float, int, str]]:
+    """Returns (timestamp, level, target) for lines starting a log entry, None otherwise."""
+    m = _TS_RE.match(line)
+    if m is None:
+        return None
+    ts = _parse_ts(m.group(1))
+    rest = line[m.end() :]
+
+    lm = _LEVEL_RE.match(rest)
+    if lm is None:
+        bm = _BITCOIND_LEVEL_RE.search(rest)
+        level = LEVELS.index("ERROR" if bm and bm.group(1) == b"error" else "WARN") if bm else 2
+        return ts, level, ""
+
+    level = LEVELS.index(lm.group(1).decode())
+    tm = _TARGET_RE.match(rest, lm.end()) or _CRATE_TARGET_RE.match(rest, lm.end())
+    target = tm.group(1).decode() if tm else ""
+    return ts, level, target
+
+
+def index_paths(log_path: str) -> tuple[str, str]:
+    return log_path + INDEX_SUFFIX, log_path + META_SUFFIX
+
+
+def build_index(log_path: str):
+    """Builds (or rebuilds) the index of a single log file."""
+    idx_path, meta_path = index_paths(log_path)
+    targets: dict[str, int] = {}
+    last_ts = 0.0
+
+    with open(log_path, "rb") as log, open(idx_path + ".tmp", "wb") as idx:
+        idx.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, RECORD.size))
+        offset = 0
+        for line in log:
+            parsed = _parse_line(line)
+            if parsed is not None:
+                ts, level, target = parsed
+                # Keep timestamps monotonic so that the index can be binary-searched.
+                last_ts = max(last_ts, ts)
+                tid = targets.setdefault(target, len(targets))
+                idx.write(RECORD.pack(last_ts, offset, tid, level))
+            offset += len(line)
+
+    meta = {"targets": list(targets), "log_size": offset}
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(idx_path + ".tmp", idx_path)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def is_index_fresh(log_path: str) -> bool:
+    _, meta_path = index_paths(log_path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("log_size") == os.path.getsize(log_path)
+
+
+def find_service_logs(root: str) -> list[str]:
+    """Finds all the service logs under a datadir, e.g. `_dd/<run>` or `_dd/<run>/<env>`."""
+    logs = []
+    for dirpath, _, filenames in os.walk(root):
+        if LOG_FILE_NAME in filenames:
+            logs.append(os.path.join(dirpath, LOG_FILE_NAME))
+    return sorted(logs)
+
+
+def index_datadir(root: str, force: bool = False) -> int:
+    """Indexes every service log under `root` that has no up-to-date index yet."""
+    n = 0
+    for log_path in find_service_logs(root):
+        if force or not is_index_fresh(log_path):
+            build_index(log_path)
+            n += 1
+    return n
+
+
+@dataclass
+class LogEntry:
+    service: str
+    timestamp: float
+    level: str
+    target: str
+    offset: int
+    text: str
+
+    def __str__(self) -> str:
+        return f"[{self.service}] {self.text}"
+
+
+class LogIndex:
+    """Read-only, mmap-backed view of the index of a single service log."""
+
+    def __init__(self, log_path: str, service: Optional[str] = None):
+        if not is_index_fresh(log_path):
+            build_index(log_path)
+        idx_path, meta_path = index_paths(log_path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        self.log_path = log_path
+        self.service = service or os.path.basename(os.path.dirname(log_path))
+        self.targets: list[str] = meta["targets"]
+        self._log_size = meta["log_size"]
+
+        # The maps stay valid after the files are closed.
+        with open(idx_path, "rb") as f:
+            self._idx = _mmap(f)
+        with open(log_path, "rb") as f:
+            self._log = _mmap(f)
+
+        magic, version, rec_size = HEADER.unpack_from(self._idx, 0) if self._idx else (b"", 0, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or rec_size != RECORD.size:
+            raise ValueError(f"invalid log index for {log_path}")
+        self._n = (len(self._idx) - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _record(self, i: int) -> tuple[float, int, int, int]:
+        return RECORD.unpack_from(self._idx, HEADER.size + i * RECORD.size)
+
+    def _entry_end(self, i: int) -> int:
+        return self._record(i + 1)[1] if i + 1 < self._n else self._log_size
+
+    def _timestamps(self):
+        # Sequence view over the record timestamps, for `bisect`.
+        idx = self
+
+        class _Ts:
+            def __len__(self):
+                return idx._n
+
+            def __getitem__(self, i):
+                return idx._record(i)[0]
+
+        return _Ts()
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        min_level: Optional[str] = None,
+        target: Optional[str] = None,
+        pattern: Optional[str] = None,
+    ) -> Iterator[LogEntry]:
+        """
+        Yields the entries in `[start, end]` with at least `min_level`, whose target contains
+        `target` and whose text matches the regex `pattern`, in log order.
+        """
+        ts = self._timestamps()
+        lo = bisect_left(ts, start) if start is not None else 0
+        hi = bisect_right(ts, end) if end is not None else self._n
+        min_lvl = LEVELS.index(min_level.upper()) if min_level else 0
+        tids = (
+            {i for i, t in enumerate(self.targets) if target in t} if target is not None else None
+        )
+        regex = re.compile(pattern) if pattern else None
+
+        for i in range(lo, hi):
+            t, offset, tid, level = self._record(i)
+            if level < min_lvl:
+                continue
+            if tids is not None and tid not in tids:
+                continue
+            text = self._log[offset : self._entry_end(i)].decode("utf-8", errors="replace")
+            if regex is not None and not regex.search(text):
+                continue
+            yield LogEntry(self.service, t, LEVELS[level], self.targets[tid], offset, text.rstrip())
+
+    def close(self):
+        for m in (self._idx, self._log):
+            if m:
+                m.close()
+
+
+def _mmap(f):
+    # Empty files can't be mmapped.
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def query_datadir(root: str, service: Optional[str] = None, **filters) -> Iterator[LogEntry]:
+    """
+    Queries all the service logs under `root`, merging the results by timestamp. Services are
+    named by their path relative to `root`, e.g. `basic/sequencer`, and can be filtered by
+    substring with `service`. See `LogIndex.query` for the other filters.
+    """
+    indexes = []
+    for log_path in find_service_logs(root):
+        name = os.path.relpath(os.path.dirname(log_path), root)
+        if service is not None and service not in name:
+            continue
+        indexes.append(LogIndex(log_path, service=name))
+
+    try:
+        yield from heapq.merge(
+            *(idx.query(**filters) for idx in indexes), key=lambda e: e.timestamp
+        )
+    finally:
+        for idx in indexes:
+            idx.close()
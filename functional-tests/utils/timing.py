@@ -0,0 +1,103 @@
+"""
+Wall time accounting for the phases of a test run: env init, premain, main, teardown and
+service starts/stops, to see where the time of a run goes.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional
+
+# Phase kinds.
+ENV_INIT = "env_init"
+ENV_STEP = "env_step"
+PREMAIN = "premain"
+MAIN = "main"
+TEARDOWN = "teardown"
+SERVICE_START = "service_start"
+SERVICE_STOP = "service_stop"
+
+
+class PhaseTimer:
+    """
+    Records the duration of named phases. Phases happening while a test runs are attributed
+    to it, see `set_test`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self.records: list[dict] = []
+        self.current_test: Optional[str] = None
+
+    def set_test(self, name: Optional[str]):
+        self.current_test = name
+
+    @contextmanager
+    def phase(self, kind: str, name: str):
+        """Times the body of the `with` block as a phase of `kind`."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            record = {
+                "kind": kind,
+                "name": name,
+                "test": self.current_test,
+                "start": round(start - self._origin, 3),
+                "duration": round(end - start, 3),
+            }
+            with self._lock:
+                self.records.append(record)
+
+    def report(self) -> dict:
+        """
+        Summarizes the records: total time per phase kind, a ranking of the (kind, name) pairs
+        by total wall time and the breakdown of every test.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        by_kind = defaultdict(float)
+        by_phase = defaultdict(lambda: {"count": 0, "total_secs": 0.0})
+        tests = defaultdict(lambda: defaultdict(float))
+        for r in records:
+            # Env steps are already counted in their env init.
+            if r["kind"] != ENV_STEP:
+                by_kind[r["kind"]] += r["duration"]
+            entry = by_phase[(r["kind"], r["name"])]
+            entry["count"] += 1
+            entry["total_secs"] += r["duration"]
+            if r["test"] is not None:
+                tests[r["test"]][r["kind"]] += r["duration"]
+
+        ranking = [
+            {
+                "kind": kind,
+                "name": name,
+                "count": e["count"],
+                "total_secs": round(e["total_secs"], 3),
+            }
+            for (kind, name), e in by_phase.items()
+        ]
+        ranking.sort(key=lambda e: e["total_secs"], reverse=True)
+
+        return {
+            "by_kind": {k: round(v, 3) for k, v in by_kind.items()},
+            "ranking": ranking,
+            "tests": {t: {k: round(v, 3) for k, v in kinds.items()} for t, kinds in tests.items()},
+            "records": records,
+        }
+
+
+# Timer shared by the whole harness.
+TIMER = PhaseTimer()
+
+
+def format_ranking(report: dict, limit: int = 15) -> str:
+    lines = ["Where the wall time went:"]
+    for e in report["ranking"][:limit]:
+        lines.append(f"{e['total_secs']:>10.2f}s  {e['kind']:<14} {e['name']} (x{e['count']})")
+    return "\n".join(lines)
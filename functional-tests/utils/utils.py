@@ -1,16 +1,29 @@
+import asyncio
 import logging
 import math
 import os
 import subprocess
 import time
+from collections.abc import Awaitable
 from dataclasses import dataclass
 from threading import Thread
 from typing import Any, Callable, Optional, TypeVar
 
 from bitcoinlib.services.bitcoind import BitcoindClient
-from strata_utils import convert_to_xonly_pk, musig_aggregate_pks
+from strata_utils import (
+    convert_to_xonly_pk,
+    deposit_request_transaction,
+    drain_wallet,
+    get_balance,
+    get_balance_recovery,
+    musig_aggregate_pks,
+    take_back_transaction,
+)
+from web3 import Web3
 
 from factory.seqrpc import JsonrpcClient
+from factory.sleeps import wait_helper
+from factory.trace import CAT_WAIT, TRACE
 from utils.constants import *
 
 
@@ -56,6 +69,7 @@ def generate_n_blocks(bitcoin_rpc: BitcoindClient, n: int):
         return
 
 
+@wait_helper
 def wait_until(
     fn: Callable[[], Any],
     error_with: str = "Timed out",
@@ -66,20 +80,23 @@ def wait_until(
     Wait until a function call returns truth value, given time step, and timeout.
     This function waits until function call returns truth value at the interval of 1 sec
     """
-    for _ in range(math.ceil(timeout / step)):
-        try:
-            if not fn():
-                raise Exception
-            return
-        except Exception as _:
-            pass
-        time.sleep(step)
+    with TRACE.span("wait_until", CAT_WAIT, {"error_with": error_with}) as trace_args:
+        for polls in range(1, math.ceil(timeout / step) + 1):
+            trace_args["polls"] = polls
+            try:
+                if not fn():
+                    raise Exception
+                return
+            except Exception as _:
+                pass
+            time.sleep(step)
     raise AssertionError(error_with)
 
 
 T = TypeVar("T")
 
 
+@wait_helper
 def wait_until_with_value(
     fn: Callable[..., T],
     predicate: Callable[[T], bool],
@@ -91,18 +108,78 @@ def wait_until_with_value(
     Similar to `wait_until` but this returns the value of the function.
     This also takes another predicate which acts on the function value and returns a bool
     """
+    with TRACE.span("wait_until_with_value", CAT_WAIT, {"error_with": error_with}) as trace_args:
+        for polls in range(1, math.ceil(timeout / step) + 1):
+            trace_args["polls"] = polls
+            try:
+                r = fn()
+                if not predicate(r):
+                    raise Exception
+                return r
+            except Exception as _:
+                pass
+            time.sleep(step)
+    raise AssertionError(error_with)
+
+
+async def wait_until_async(
+    fn: Callable[[], Awaitable[Any]],
+    error_with: str = "Timed out",
+    timeout: int = 5,
+    step: float = 0.5,
+):
+    """
+    Async version of `wait_until`, for awaitables such as the `*_async` wallet helpers
+    below. Yields to the event loop between polls so other waits can make progress.
+    """
     for _ in range(math.ceil(timeout / step)):
         try:
-            r = fn()
-            if not predicate(r):
+            if not await fn():
                 raise Exception
-            return r
+            return
         except Exception as _:
             pass
-        time.sleep(step)
+        await asyncio.sleep(step)
     raise AssertionError(error_with)
 
 
+# Async versions of the bitcoind-backed `strata_utils` helpers. These run on worker threads,
+# the helpers release the GIL while they sync the wallet, so several of them can be awaited
+# concurrently on one event loop.
+
+
+async def deposit_request_transaction_async(
+    el_address: str, musig_bridge_pk: str, bitcoind_url: str, user: str, password: str
+) -> bytes:
+    return await asyncio.to_thread(
+        deposit_request_transaction, el_address, musig_bridge_pk, bitcoind_url, user, password
+    )
+
+
+async def take_back_transaction_async(
+    address: str, musig_bridge_pk: str, bitcoind_url: str, user: str, password: str
+) -> bytes:
+    return await asyncio.to_thread(
+        take_back_transaction, address, musig_bridge_pk, bitcoind_url, user, password
+    )
+
+
+async def drain_wallet_async(address: str, bitcoind_url: str, user: str, password: str) -> bytes:
+    return await asyncio.to_thread(drain_wallet, address, bitcoind_url, user, password)
+
+
+async def get_balance_async(address: str, bitcoind_url: str, user: str, password: str) -> int:
+    return await asyncio.to_thread(get_balance, address, bitcoind_url, user, password)
+
+
+async def get_balance_recovery_async(
+    address: str, musig_bridge_pk: str, bitcoind_url: str, user: str, password: str
+) -> int:
+    return await asyncio.to_thread(
+        get_balance_recovery, address, musig_bridge_pk, bitcoind_url, user, password
+    )
+
+
 @dataclass
 class ManualGenBlocksConfig:
     btcrpc: BitcoindClient
@@ -117,6 +194,7 @@ class RollupParamsSettings:
     genesis_trigger: int
     message_interval: int
     proof_timeout: Optional[int] = None
+    l1_reorg_safe_depth: Optional[int] = None
 
     # NOTE: type annotation: Ideally we would use `Self` but couldn't use it
     # even after changing python version to 3.12
@@ -198,11 +276,7 @@ def submit_checkpoint(
     # Post checkpoint proof
     # NOTE: Since operating in timeout mode is supported, i.e. sequencer
     # will post empty proof if prover doesn't submit proofs in time.
-    proof_keys = prover_rpc.dev_strata_proveCheckpoint(idx)
-    proof_key = proof_keys[0]
-    wait_for_proof_with_time_out(prover_rpc, proof_key)
-    proof = prover_rpc.dev_strata_getProof(proof_key)
-
+    proof = prove_checkpoint(idx, prover_rpc)
     seqrpc.strataadmin_submitCheckpointProof(idx, proof)
 
     # Wait a while for it to be posted to l1. This will happen when there
@@ -225,6 +299,31 @@ def submit_checkpoint(
         )
 
 
+def get_broadcast_idx(seqrpc, btcrpc, txid: str) -> Optional[int]:
+    """
+    Index of the tx `txid` in the broadcaster database of the sequencer, the `idx` it is
+    logged with when published, or None if the broadcaster doesn't have it.
+    """
+    found = None
+    idx = 0
+    while (entry := seqrpc.strata_getTxEntryByIdx(idx)) is not None:
+        # Entries hold the raw tx, witness included, so the txid is computed by bitcoind.
+        if btcrpc.proxy.decoderawtransaction(bytes(entry["tx_raw"]).hex())["txid"] == txid:
+            found = idx
+        idx += 1
+    return found
+
+
+def prove_checkpoint(idx: int, prover_rpc):
+    """
+    Has the prover client prove checkpoint `idx` and returns the proof.
+    """
+    proof_keys = prover_rpc.dev_strata_proveCheckpoint(idx)
+    proof_key = proof_keys[0]
+    wait_for_proof_with_time_out(prover_rpc, proof_key)
+    return prover_rpc.dev_strata_getProof(proof_key)
+
+
 def check_submit_proof_fails_for_nonexistent_batch(seqrpc, nonexistent_batch: int):
     """
     Requires that submitting nonexistent batch proof fails
@@ -352,6 +451,8 @@ def generate_params(settings: RollupParamsSettings, seqpubkey: str, oppubkeys: l
     ]
     if settings.proof_timeout is not None:
         cmd.extend(["--proof-timeout", str(settings.proof_timeout)])
+    if settings.l1_reorg_safe_depth is not None:
+        cmd.extend(["--reorg-safe-depth", str(settings.l1_reorg_safe_depth)])
     # fmt: on
 
     for k in oppubkeys:
@@ -511,6 +612,64 @@ def submit_da_blob(btcrpc: BitcoindClient, seqrpc: JsonrpcClient, blobdata: str)
     return tx
 
 
+def split_schnorr_precompile_inputs(packed: bytes) -> list[bytes]:
+    """
+    Splits the packed buffer returned by `sign_schnorr_sigs` into individual precompile inputs.
+    """
+    n = SCHNORR_PRECOMPILE_INPUT_LEN
+    assert len(packed) % n == 0, "packed inputs must be a multiple of the input length"
+    return [packed[i : i + n] for i in range(0, len(packed), n)]
+
+
+def send_schnorr_precompile_calls(web3: Web3, packed: bytes, gas: int = 100_000) -> list:
+    """
+    Fires one Schnorr precompile transaction per packed input without waiting for inclusion.
+
+    Nonces are assigned locally and the transactions are sent back to back, so that as many of
+    them as possible land in the same block. Returns the tx hashes in the order of the inputs.
+    """
+    dest = web3.to_checksum_address(PRECOMPILE_SCHNORR_ADDRESS)
+    source = web3.address
+    nonce = web3.eth.get_transaction_count(source, "pending")
+
+    txids = []
+    for i, data in enumerate(split_schnorr_precompile_inputs(packed)):
+        txid = web3.eth.send_transaction(
+            {
+                "to": dest,
+                "value": hex(0),
+                "gas": hex(gas),
+                "from": source,
+                "nonce": nonce + i,
+                "data": data,
+            }
+        )
+        txids.append(txid)
+    return txids
+
+
+def wait_for_receipts(web3: Web3, txids: list, timeout: int = 30, step: float = 0.5) -> list:
+    """
+    Waits until all the given transactions have a receipt and returns them in the same order.
+    """
+    receipts = {}
+
+    def _collect() -> bool:
+        for txid in txids:
+            if txid in receipts:
+                continue
+            try:
+                receipts[txid] = web3.eth.get_transaction_receipt(txid)
+            except Exception:
+                return False
+        return True
+
+    wait_until(
+        _collect, error_with="Not all transactions were included", timeout=timeout, step=step
+    )
+    return [receipts[txid] for txid in txids]
+
+
 def cl_slot_to_block_id(seqrpc, slot):
     """Convert L2 slot number to block ID."""
     l2_blocks = seqrpc.strata_getHeadersAtIdx(slot)